@@ -0,0 +1,52 @@
+"""hot filter indexes
+
+Secondary indexes for the filters and orderings used by app/routes:
+category pages, featured products, low stock, a customer's order history
+and the order_items foreign keys. On PostgreSQL they are built
+CONCURRENTLY so large tables stay writable during the migration.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_products_category_id', 'products', ['category_id'], {}),
+    ('ix_products_active_category_created_at_id', 'products', ['is_active', 'category_id', 'created_at', 'id'], {}),
+    ('ix_products_featured_created_at_id', 'products', ['created_at', 'id'], {
+        'sqlite_where': sa.text('is_active = 1 AND is_featured = 1'),
+        'postgresql_where': sa.text('is_active = true AND is_featured = true'),
+    }),
+    ('ix_products_active_stock_quantity', 'products', ['is_active', 'stock_quantity'], {}),
+    ('ix_orders_user_id_created_at_id', 'orders', ['user_id', 'created_at', 'id'], {}),
+    ('ix_order_items_order_id', 'order_items', ['order_id'], {}),
+    ('ix_order_items_product_id', 'order_items', ['product_id'], {}),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns, options in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **options)
+    else:
+        for name, table, columns, options in INDEXES:
+            op.create_index(name, table, columns, **options)
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
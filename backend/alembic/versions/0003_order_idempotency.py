@@ -0,0 +1,34 @@
+"""order idempotency
+
+Idempotency key and request fingerprint on orders, unique per user, so a
+retried create_order returns the order it already created.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('orders', sa.Column('idempotency_key', sa.String(length=255), nullable=True))
+    op.add_column('orders', sa.Column('request_fingerprint', sa.String(length=64), nullable=True))
+    op.create_index('ix_orders_user_id_idempotency_key', 'orders', ['user_id', 'idempotency_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_user_id_idempotency_key', table_name='orders')
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('request_fingerprint')
+        batch_op.drop_column('idempotency_key')
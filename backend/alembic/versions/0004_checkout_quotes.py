@@ -0,0 +1,39 @@
+"""checkout quotes
+
+Priced carts saved by create_payment_intent and consumed by create_order.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('checkout_quotes',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('cart', sa.JSON(), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_checkout_quotes_expires_at', 'checkout_quotes', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_checkout_quotes_expires_at', table_name='checkout_quotes')
+    op.drop_table('checkout_quotes')
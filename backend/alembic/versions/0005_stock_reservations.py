@@ -0,0 +1,47 @@
+"""stock reservations
+
+Reserved-units counter on products and the stock_holds table behind it.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 14:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('reserved_quantity', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('stock_holds',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('payment_intent_id', sa.String(length=255), nullable=False),
+    sa.Column('product_id', sa.String(length=36), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stock_holds_expires_at', 'stock_holds', ['expires_at'], unique=False)
+    op.create_index('ix_stock_holds_payment_intent_id', 'stock_holds', ['payment_intent_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_holds_payment_intent_id', table_name='stock_holds')
+    op.drop_index('ix_stock_holds_expires_at', table_name='stock_holds')
+    op.drop_table('stock_holds')
+    if op.get_bind().dialect.name == "sqlite":
+        # Native DROP COLUMN keeps the products_fts triggers a batch rebuild would lose
+        op.execute("ALTER TABLE products DROP COLUMN reserved_quantity")
+    else:
+        op.drop_column('products', 'reserved_quantity')
@@ -0,0 +1,47 @@
+"""low stock feed
+
+Per-product reorder threshold and a partial index holding only the
+products currently below it. On PostgreSQL the index is built
+CONCURRENTLY so products stay writable during the migration.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_OPTIONS = {
+    'sqlite_where': sa.text('is_active = 1 AND stock_quantity > 0 AND stock_quantity < reorder_threshold'),
+    'postgresql_where': sa.text('is_active = true AND stock_quantity > 0 AND stock_quantity < reorder_threshold'),
+}
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('reorder_threshold', sa.Integer(), server_default='10', nullable=False))
+    if op.get_bind().dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with op.get_context().autocommit_block():
+            op.create_index('ix_products_low_stock', 'products', ['stock_quantity', 'id'],
+                            postgresql_concurrently=True, if_not_exists=True, **INDEX_OPTIONS)
+    else:
+        op.create_index('ix_products_low_stock', 'products', ['stock_quantity', 'id'], **INDEX_OPTIONS)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_low_stock', table_name='products')
+    if op.get_bind().dialect.name == "sqlite":
+        # Native DROP COLUMN keeps the products_fts triggers a batch rebuild would lose
+        op.execute("ALTER TABLE products DROP COLUMN reorder_threshold")
+    else:
+        op.drop_column('products', 'reorder_threshold')
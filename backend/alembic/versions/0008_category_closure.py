@@ -0,0 +1,50 @@
+"""category closure table
+
+Ancestor/descendant pairs for the category tree, backfilled from the
+existing parent_id links.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 17:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    closure = op.create_table('category_closure',
+    sa.Column('ancestor_id', sa.String(length=36), nullable=False),
+    sa.Column('descendant_id', sa.String(length=36), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_category_closure_descendant_id', 'category_closure', ['descendant_id'], unique=False)
+
+    # Walk each category up to its root; catalogs have few enough categories to do this in Python
+    parents = dict(op.get_bind().execute(sa.text("SELECT id, parent_id FROM categories")).all())
+    rows = []
+    for category_id in parents:
+        ancestor, depth, seen = category_id, 0, set()
+        while ancestor is not None and ancestor not in seen:
+            rows.append({'ancestor_id': ancestor, 'descendant_id': category_id, 'depth': depth})
+            seen.add(ancestor)
+            ancestor, depth = parents.get(ancestor), depth + 1
+    if rows:
+        op.bulk_insert(closure, rows)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_category_closure_descendant_id', table_name='category_closure')
+    op.drop_table('category_closure')
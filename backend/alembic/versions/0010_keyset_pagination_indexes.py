@@ -0,0 +1,46 @@
+"""keyset pagination indexes
+
+(sort column, id) indexes behind the cursor-paginated product, user and
+admin order listings. Skipped where they already exist. On PostgreSQL they
+are built CONCURRENTLY so large tables stay writable during the migration.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_products_active_created_at_id', 'products', ['is_active', 'created_at', 'id']),
+    ('ix_products_active_price_id', 'products', ['is_active', 'price', 'id']),
+    ('ix_products_active_name_id', 'products', ['is_active', 'name', 'id']),
+    ('ix_users_created_at_id', 'users', ['created_at', 'id']),
+    ('ix_orders_created_at_id', 'orders', ['created_at', 'id']),
+    ('ix_orders_status_created_at_id', 'orders', ['status', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,90 @@
+"""daily stats rollup
+
+The per-day order and sign-up counters behind the admin dashboard,
+backfilled from existing orders and users. Left alone if the table is
+already there (and maintained).
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 09:20:00.000000
+
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUSES = ('pending', 'paid', 'processing', 'shipped', 'delivered', 'cancelled', 'refunded')
+REVENUE_STATUSES = {'paid', 'processing', 'shipped', 'delivered'}
+
+
+def _as_date(value) -> date:
+    # date() comes back as a string on SQLite
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table('daily_stats'):
+        return
+
+    daily_stats = op.create_table('daily_stats',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('pending_orders', sa.Integer(), nullable=False),
+    sa.Column('paid_orders', sa.Integer(), nullable=False),
+    sa.Column('processing_orders', sa.Integer(), nullable=False),
+    sa.Column('shipped_orders', sa.Integer(), nullable=False),
+    sa.Column('delivered_orders', sa.Integer(), nullable=False),
+    sa.Column('cancelled_orders', sa.Integer(), nullable=False),
+    sa.Column('refunded_orders', sa.Integer(), nullable=False),
+    sa.Column('new_users', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('date')
+    )
+
+    days = {}
+
+    def row(day):
+        return days.setdefault(_as_date(day), {
+            'date': _as_date(day), 'revenue': Decimal('0'), 'order_count': 0, 'new_users': 0,
+            **{f'{status}_orders': 0 for status in STATUSES},
+        })
+
+    orders = bind.execute(sa.text(
+        "SELECT date(created_at), status, count(*), sum(total_amount) FROM orders "
+        "WHERE created_at IS NOT NULL GROUP BY date(created_at), status"
+    )).all()
+    for day, status, count, amount in orders:
+        entry = row(day)
+        entry['order_count'] += count
+        if status in STATUSES:
+            entry[f'{status}_orders'] += count
+        if status in REVENUE_STATUSES:
+            entry['revenue'] += Decimal(str(amount or 0))
+
+    users = bind.execute(sa.text(
+        "SELECT date(created_at), count(*) FROM users WHERE created_at IS NOT NULL GROUP BY date(created_at)"
+    )).all()
+    for day, count in users:
+        row(day)['new_users'] += count
+
+    if days:
+        op.bulk_insert(daily_stats, list(days.values()))
+
+
+def downgrade() -> None:
+    op.drop_table('daily_stats')
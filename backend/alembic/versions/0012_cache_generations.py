@@ -0,0 +1,33 @@
+"""cache generations
+
+Per-namespace invalidation counters that keep the workers' in-process
+response caches in step.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('cache_generations',
+    sa.Column('namespace', sa.String(length=50), nullable=False),
+    sa.Column('generation', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('namespace')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cache_generations')
@@ -0,0 +1,41 @@
+"""stock events
+
+Stock state changes written with the change itself, so every worker can
+relay them to its low-stock SSE subscribers.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stock_events',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('event', sa.String(length=20), nullable=False),
+    sa.Column('previous', sa.String(length=20), nullable=False),
+    sa.Column('product_id', sa.String(length=36), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=True),
+    sa.Column('stock_quantity', sa.Integer(), nullable=False),
+    sa.Column('reorder_threshold', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stock_events_created_at', 'stock_events', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_events_created_at', table_name='stock_events')
+    op.drop_table('stock_events')
@@ -0,0 +1,32 @@
+"""stock hold user
+
+Owner of each stock hold, so a new payment intent replaces the shopper's
+earlier holds instead of adding to them.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0014'
+down_revision: Union[str, None] = '0013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('stock_holds', sa.Column('user_id', sa.String(length=36), nullable=True))
+    op.create_index('ix_stock_holds_user_id', 'stock_holds', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_holds_user_id', table_name='stock_holds')
+    with op.batch_alter_table('stock_holds') as batch_op:
+        batch_op.drop_column('user_id')
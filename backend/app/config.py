@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from decimal import Decimal
+from typing import List, Literal
 
 
 class Settings(BaseSettings):
@@ -11,12 +12,46 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./brands_galaxy.db"
     DATABASE_ECHO: bool = False
+    # Connection pool per engine (PostgreSQL); watch db_pool_* at /metrics when tuning
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 3600
+    # Connections all API workers may hold together; when set, each worker's request pool
+    # gets DB_CONNECTION_BUDGET // WEB_CONCURRENCY instead of DB_POOL_SIZE + DB_MAX_OVERFLOW
+    DB_CONNECTION_BUDGET: int = 0
+    WEB_CONCURRENCY: int = 1  # API worker processes; gunicorn.conf.py sets it
+
+    # SQL instrumentation
+    SERVER_TIMING_ENABLED: bool = True  # Per-request query count and DB time in a Server-Timing header
+    SLOW_QUERY_THRESHOLD_MS: float = 100
+    SLOW_QUERY_LOG_SIZE: int = 200  # Most recent slow statements kept in memory
+
+    # Prometheus metrics at /metrics; set PROMETHEUS_MULTIPROC_DIR when running several workers
+    METRICS_ENABLED: bool = True
+
+    # Startup: the schema comes from `alembic upgrade head`, run before the app starts
+    SCHEMA_VERSION_CHECK: bool = True  # Refuse to start on a database that is missing migrations
+    STARTUP_WARMUP: bool = False  # Open pool connections and prime hot routes before serving
+    STARTUP_WARMUP_PATHS: List[str] = [
+        "/api/v1/products/",
+        "/api/v1/products/?is_featured=true",
+        "/api/v1/products/categories/",
+        "/api/v1/products/categories/tree",
+    ]
 
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production-min-32-characters"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    # How often each worker checks whether another process changed a user's
+    # is_active/is_admin; 0 leaves that to USER_CACHE_TTL_SECONDS
+    USER_CACHE_SYNC_SECONDS: float = 1.0
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
 
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:3001", "https://frontend-lime-three-35.vercel.app"]
@@ -33,15 +68,60 @@ class Settings(BaseSettings):
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
     FROM_EMAIL: str = "noreply@brandsgalaxy.com"
+    ADMIN_ALERT_EMAIL: str = ""  # Low-stock alerts; empty disables them
 
     # File Upload
     UPLOAD_DIR: str = "uploads"
     MAX_UPLOAD_SIZE: int = 5 * 1024 * 1024  # 5MB
 
+    # Public catalog response cache
+    CATALOG_CACHE_TTL_SECONDS: int = 30
+    CATALOG_CACHE_MAX_SIZE: int = 2048
+    CATALOG_CACHE_MAX_AGE: int = 30
+    # How often each worker publishes its invalidations to, and picks up the others' from,
+    # the cache_generations table; 0 turns that off (a single worker needs none)
+    CATALOG_CACHE_SYNC_SECONDS: float = 1.0
+
+    # Checkout pricing
+    SHIPPING_FLAT_RATE: Decimal = Decimal("10.00")
+    FREE_SHIPPING_THRESHOLD: Decimal = Decimal("100.00")
+    TAX_RATE: Decimal = Decimal("0.08")
+    CHECKOUT_QUOTE_TTL_SECONDS: int = 30 * 60
+
+    # Stock reservations
+    STOCK_HOLD_TTL_SECONDS: int = 15 * 60
+    STOCK_HOLD_SWEEP_INTERVAL_SECONDS: int = 30
+
+    # Background jobs
+    JOB_BACKEND: str = "database"  # "database" (outbox table) or "memory"
+    JOB_WORKER_IN_PROCESS: bool = True  # Set False when running worker.py separately
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 10
+    JOB_RETRY_MAX_SECONDS: float = 3600
+    JOB_POLL_INTERVAL_SECONDS: float = 5
+    JOB_BATCH_SIZE: int = 10
+    JOB_LOCK_TIMEOUT_SECONDS: int = 300
+
+    # Low-stock feed
+    LOW_STOCK_THRESHOLD: int = 10  # Reorder threshold for products that don't set their own
+    LOW_STOCK_STREAM_KEEPALIVE_SECONDS: float = 15
+    LOW_STOCK_STREAM_POLL_SECONDS: float = 1  # How often each worker relays new stock events to its streams
+    LOW_STOCK_EVENT_RETENTION_SECONDS: int = 3600
+
+    # Bulk product import
+    PRODUCT_IMPORT_CHUNK_SIZE: int = 1000
+    PRODUCT_IMPORT_MAX_ERRORS: int = 1000
+
+    # Admin order export
+    ORDER_EXPORT_BATCH_SIZE: int = 500
+
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
 
+    # JSON responses
+    JSON_DECIMAL_MODE: Literal["string", "number"] = "string"  # How prices and amounts are encoded
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,7 +1,42 @@
+from typing import Tuple
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.utils.metrics import instrument_pool, record_pool_size
+from app.utils.sql_stats import instrument_engine
+
+# Async drivers used by the request path, keyed by sync dialect
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """Translate a sync DATABASE_URL into its async-driver equivalent"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def request_pool_limits() -> Tuple[int, int]:
+    """pool_size and max_overflow of one worker's request (async) pool.
+
+    With a DB_CONNECTION_BUDGET, each of the WEB_CONCURRENCY workers gets an
+    equal share, half kept open and half as overflow, so all of them
+    together never exceed the budget.
+    """
+    if settings.DB_CONNECTION_BUDGET <= 0:
+        return settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    share = max(1, settings.DB_CONNECTION_BUDGET // max(1, settings.WEB_CONCURRENCY))
+    pool_size = max(1, share // 2)
+    return pool_size, share - pool_size
+
 
 # SQLite requires different configuration than PostgreSQL
 if settings.DATABASE_URL.startswith("sqlite"):
@@ -10,25 +45,69 @@ if settings.DATABASE_URL.startswith("sqlite"):
         echo=settings.DATABASE_ECHO,
         connect_args={"check_same_thread": False}
     )
+    async_engine = create_async_engine(
+        get_async_database_url(settings.DATABASE_URL),
+        echo=settings.DATABASE_ECHO
+    )
 else:
     engine = create_engine(
         settings.DATABASE_URL,
         echo=settings.DATABASE_ECHO,
         pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20,
-        pool_recycle=3600
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE
     )
+    # Request handlers only use async_engine, so only its pool counts against the budget
+    request_pool_size, request_max_overflow = request_pool_limits()
+    async_engine = create_async_engine(
+        get_async_database_url(settings.DATABASE_URL),
+        echo=settings.DATABASE_ECHO,
+        pool_pre_ping=True,
+        pool_size=request_pool_size,
+        max_overflow=request_max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE
+    )
+
+# Query counts, timings and the slow-query log (app/utils/sql_stats.py)
+instrument_engine(engine)
+instrument_engine(async_engine)
+# Pool checkouts, overflow and wait time for /metrics
+instrument_pool(engine, "sync")
+instrument_pool(async_engine, "async")
+
 
+def reset_after_fork() -> None:
+    """Give a freshly forked worker its own, empty pools.
+
+    Connections opened before the fork (while preloading the app) belong
+    to the parent; they are dropped without being closed, which would close
+    them for the parent too.
+    """
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    record_pool_size(engine, "sync")
+    record_pool_size(async_engine, "async")
+
+
+# Sync sessions for scripts and schema management (seed_data.py, create_admin.py)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async sessions for request handlers. Objects stay loaded after commit so
+# responses can be serialized without a lazy load outside the event loop.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """Database session dependency"""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -1,17 +1,78 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 from app.database import get_db
-from app.models.user import User
+from app.models.user import AUTH_CACHE_NAMESPACE, AUTH_FIELDS, User
+from app.schemas.user import CurrentUser
 from app.utils.auth import decode_access_token
+from app.utils.cache import CacheBackend, TTLCache
+from app.utils.cache_sync import CacheSync
+from app.config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
+# Auth attributes by user id; replace with set_user_cache() to share across workers.
+# ORM changes to the cached flags reach every worker through user_cache_sync;
+# a raw SQL UPDATE only takes effect as entries expire (USER_CACHE_TTL_SECONDS)
+user_cache: CacheBackend = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def set_user_cache(backend: CacheBackend) -> None:
+    """Swap the backend used to cache authenticated users"""
+    global user_cache
+    user_cache = backend
+
+
+def _user_cache_key(user_id: str) -> str:
+    return f"auth:user:{user_id}"
+
+
+def invalidate_user_cache(user_id: str) -> None:
+    """Drop a user's cached auth attributes"""
+    user_cache.delete(_user_cache_key(str(user_id)))
+
+
+def clear_user_cache() -> None:
+    user_cache.clear()
+
+
+# Empties this worker's user cache when the models record a change from any process
+user_cache_sync = CacheSync(AUTH_CACHE_NAMESPACE, clear_user_cache)
+
+
+@event.listens_for(User, "after_update")
+def _queue_user_eviction(mapper, connection, target):
+    """Remember users whose auth flags changed so they are evicted on commit"""
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in AUTH_FIELDS):
+        object_session(target).info.setdefault("evict_user_ids", set()).add(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _queue_user_delete_eviction(mapper, connection, target):
+    object_session(target).info.setdefault("evict_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_users(session):
+    for user_id in session.info.pop("evict_user_ids", ()):
+        invalidate_user_cache(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_evictions(session):
+    session.info.pop("evict_user_ids", None)
+
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> CurrentUser:
     """Get current authenticated user"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -27,16 +88,25 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
+    cache_key = _user_cache_key(user_id)
+    cached = user_cache.get(cache_key)
+    if cached is not None:
+        return CurrentUser(**cached)
+
+    result = await db.execute(select(User.id, User.is_active, User.is_admin).filter(User.id == user_id))
+    user = result.first()
     if user is None:
         raise credentials_exception
 
-    return user
+    attributes = {"id": user.id, "is_active": user.is_active, "is_admin": user.is_admin}
+    user_cache.set(cache_key, attributes)
+
+    return CurrentUser(**attributes)
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: CurrentUser = Depends(get_current_user)
+) -> CurrentUser:
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -44,8 +114,8 @@ async def get_current_active_user(
 
 
 async def get_current_admin(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: CurrentUser = Depends(get_current_active_user)
+) -> CurrentUser:
     """Get current admin user"""
     if not current_user.is_admin:
         raise HTTPException(
@@ -1,20 +1,80 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from app.database import engine, Base
+from app.database import async_engine
 from app.routes import auth, products, orders, admin
+from app.routes.products import catalog_sync
 from app.config import settings
+from app.dependencies import user_cache_sync
+from app.utils.reservations import run_hold_sweeper
+from app.utils import notifications  # noqa: F401 - registers the job handlers
+from app.utils.jobs import run_worker
+from app.utils.low_stock import stock_event_relay
+from app.utils.sql_stats import SQLStatsMiddleware
+from app.utils.metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, render_metrics
+from app.utils.schema import verify_schema
+from app.utils.warmup import warm_up
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables come from `alembic upgrade head`; importing the app never touches the database
+    started = time.perf_counter()
+    if settings.SCHEMA_VERSION_CHECK:
+        await verify_schema(async_engine)
+    if settings.STARTUP_WARMUP:
+        await warm_up(app, async_engine)
+    app.state.startup_seconds = time.perf_counter() - started
+    logger.info("Startup finished in %.0f ms", app.state.startup_seconds * 1000)
+
+    # Hand expired checkout holds back to available stock
+    tasks = [asyncio.create_task(run_hold_sweeper(settings.STOCK_HOLD_SWEEP_INTERVAL_SECONDS))]
+    # Run queued jobs here unless a separate worker.py process does
+    if settings.JOB_WORKER_IN_PROCESS:
+        tasks.append(asyncio.create_task(run_worker()))
+    # Relay stock state changes from every worker to this one's low-stock streams
+    tasks.append(asyncio.create_task(stock_event_relay.run(settings.LOW_STOCK_STREAM_POLL_SECONDS)))
+    # Share catalog cache invalidations with the other workers
+    if settings.CATALOG_CACHE_TTL_SECONDS > 0 and settings.CATALOG_CACHE_SYNC_SECONDS > 0:
+        tasks.append(asyncio.create_task(catalog_sync.run(settings.CATALOG_CACHE_SYNC_SECONDS)))
+    # Pick up user deactivations and admin changes made by other workers and scripts
+    if settings.USER_CACHE_TTL_SECONDS > 0 and settings.USER_CACHE_SYNC_SECONDS > 0:
+        tasks.append(asyncio.create_task(user_cache_sync.run(settings.USER_CACHE_SYNC_SECONDS)))
+    yield
+    for background in tasks:
+        background.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    # Close pooled connections rather than leave them to time out (workers are recycled)
+    await async_engine.dispose()
+
+
+class GZipExceptStreams(GZipMiddleware):
+    """GZip, except for server-sent event streams, whose events it would hold back until its buffer fills"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.APP_NAME,
     description="Premium E-commerce API for luxury cosmetics and skincare",
     version="1.0.0",
     docs_url="/api/docs" if settings.DEBUG else None,
-    redoc_url="/api/redoc" if settings.DEBUG else None
+    redoc_url="/api/redoc" if settings.DEBUG else None,
+    # orjson encodes response bodies; see app/utils/serialization.py
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Security middleware
@@ -31,11 +91,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed"],
     max_age=3600
 )
 
 # Compression middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(GZipExceptStreams, minimum_size=1000)
+
+# Per-request SQL query count and time (Server-Timing header)
+app.add_middleware(SQLStatsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
+# Request latency and in-flight metrics (served at /metrics)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(auth.router, prefix=f"/api/{settings.API_VERSION}/auth", tags=["Authentication"])
@@ -59,3 +127,10 @@ async def health_check():
         "status": "healthy",
         "app": settings.APP_NAME
     }
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint"""
+        return Response(content=render_metrics(), headers={"Content-Type": CONTENT_TYPE_LATEST})
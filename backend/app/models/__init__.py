@@ -1,13 +1,26 @@
 from app.models.user import User
-from app.models.category import Category
+from app.models.category import Category, CategoryClosure
 from app.models.product import Product
 from app.models.order import Order, OrderItem, OrderStatus
+from app.models.stats import DailyStats
+from app.models.quote import CheckoutQuote, StockHold
+from app.models.job import Job, JobStatus
+from app.models.cache import CacheGeneration
+from app.models.stock_event import StockEvent
 
 __all__ = [
     "User",
     "Category",
+    "CategoryClosure",
     "Product",
     "Order",
     "OrderItem",
-    "OrderStatus"
+    "OrderStatus",
+    "DailyStats",
+    "CheckoutQuote",
+    "StockHold",
+    "Job",
+    "JobStatus",
+    "CacheGeneration",
+    "StockEvent"
 ]
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, BigInteger
+from app.database import Base
+
+
+class CacheGeneration(Base):
+    """Invalidation counter for one response cache namespace (see app/utils/cache_sync.py).
+
+    Every worker keeps its own in-process cache; bumping the counter tells
+    the other workers to drop theirs.
+    """
+    __tablename__ = "cache_generations"
+
+    namespace = Column(String(50), primary_key=True)
+    generation = Column(BigInteger, nullable=False, default=0)
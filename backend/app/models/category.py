@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, ForeignKey, Index, delete, event, insert, literal, or_, select, true
+from sqlalchemy.orm import relationship, attributes
 import uuid
 from app.database import Base
 
@@ -20,3 +20,75 @@ class Category(Base):
     # Relationships
     products = relationship("Product", back_populates="category")
     children = relationship("Category")
+
+
+class CategoryClosure(Base):
+    """Every (ancestor, descendant) pair in the category tree, self included at depth 0.
+
+    "All of Skincare" is then a single indexed lookup on ``ancestor_id``
+    instead of a recursive walk. Rows are kept in step with ``parent_id`` by
+    the mapper events below, so every write path (routes, seed scripts)
+    maintains them.
+    """
+    __tablename__ = "category_closure"
+    __table_args__ = (
+        Index("ix_category_closure_descendant_id", "descendant_id"),
+    )
+
+    ancestor_id = Column(String(36), ForeignKey('categories.id', ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(String(36), ForeignKey('categories.id', ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+
+_closure = CategoryClosure.__table__
+
+
+def _link_subtree(connection, category_id: str, parent_id: str) -> None:
+    """Connect every ancestor of ``parent_id`` to every node in ``category_id``'s subtree"""
+    ancestors = _closure.alias("ancestors")
+    subtree = _closure.alias("subtree")
+    connection.execute(insert(_closure).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        select(ancestors.c.ancestor_id, subtree.c.descendant_id, ancestors.c.depth + subtree.c.depth + 1)
+        .select_from(ancestors.join(subtree, true()))  # Deliberate cross product
+        .where(ancestors.c.descendant_id == parent_id, subtree.c.ancestor_id == category_id)
+    ))
+
+
+@event.listens_for(Category, "after_insert")
+def _insert_closure(mapper, connection, target):
+    connection.execute(insert(_closure).values(ancestor_id=target.id, descendant_id=target.id, depth=0))
+    if target.parent_id:
+        _link_subtree(connection, target.id, target.parent_id)
+
+
+@event.listens_for(Category, "before_update")
+def _check_move(mapper, connection, target):
+    if not target.parent_id or not attributes.get_history(target, "parent_id").has_changes():
+        return
+    below = connection.execute(select(literal(1)).where(
+        _closure.c.ancestor_id == target.id, _closure.c.descendant_id == target.parent_id
+    )).first()
+    if below is not None:
+        raise ValueError("A category can't be moved under itself or one of its subcategories")
+
+
+@event.listens_for(Category, "after_update")
+def _move_closure(mapper, connection, target):
+    if not attributes.get_history(target, "parent_id").has_changes():
+        return
+    subtree = select(_closure.c.descendant_id).where(_closure.c.ancestor_id == target.id)
+    # Detach the subtree from its old ancestors, keeping its internal links
+    connection.execute(delete(_closure).where(
+        _closure.c.descendant_id.in_(subtree), _closure.c.ancestor_id.not_in(subtree)
+    ))
+    if target.parent_id:
+        _link_subtree(connection, target.id, target.parent_id)
+
+
+@event.listens_for(Category, "after_delete")
+def _delete_closure(mapper, connection, target):
+    # Not left to ON DELETE CASCADE: SQLite doesn't enforce foreign keys by default
+    connection.execute(delete(_closure).where(
+        or_(_closure.c.ancestor_id == target.id, _closure.c.descendant_id == target.id)
+    ))
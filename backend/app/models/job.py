@@ -0,0 +1,41 @@
+from sqlalchemy import Column, String, Integer, JSON, Text, DateTime, Index
+import uuid
+from enum import Enum
+from datetime import datetime
+from app.database import Base
+
+
+def generate_uuid():
+    return str(uuid.uuid4())
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """Outbox row for a background job (see app/utils/jobs.py).
+
+    Written in the same transaction as the change that caused it, so a job
+    exists exactly when that change committed. Finished jobs are deleted;
+    jobs that ran out of attempts stay as ``failed`` with their last error.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers poll for due jobs
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    name = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default=JobStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Numeric, Integer, JSON, Text, ForeignKey, DateTime
+from sqlalchemy import Column, String, Numeric, Integer, JSON, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 import uuid
 from enum import Enum
@@ -22,6 +22,15 @@ class OrderStatus(str, Enum):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination for the admin order listing, with and without a status filter
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+        # A customer's order history (list_orders), newest first via a backward scan
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Retried checkouts find the order they already created
+        Index("ix_orders_user_id_idempotency_key", "user_id", "idempotency_key", unique=True),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
@@ -34,6 +43,8 @@ class Order(Base):
     status = Column(String(20), default=OrderStatus.PENDING.value)
     payment_method = Column(String(50))
     stripe_payment_intent_id = Column(String(255), unique=True)
+    idempotency_key = Column(String(255))  # Idempotency-Key header, else the payment intent id
+    request_fingerprint = Column(String(64))  # SHA-256 of the create request, to spot reused keys
     shipping_address = Column(JSON)
     billing_address = Column(JSON)
     notes = Column(Text)
@@ -53,8 +64,8 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    order_id = Column(String(36), ForeignKey('orders.id'), nullable=False)
-    product_id = Column(String(36), ForeignKey('products.id'), nullable=False)
+    order_id = Column(String(36), ForeignKey('orders.id'), nullable=False, index=True)
+    product_id = Column(String(36), ForeignKey('products.id'), nullable=False, index=True)
     quantity = Column(Integer, nullable=False)
     price = Column(Numeric(10, 2), nullable=False)  # Price at time of purchase
     product_name = Column(String(200))  # Store name in case product is deleted
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Numeric, Integer, Boolean, JSON, Text, ForeignKey, DateTime
+from sqlalchemy import Column, String, Numeric, Integer, Boolean, JSON, Text, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
+from app.config import settings
 from app.database import Base
 
 
@@ -11,16 +12,42 @@ def generate_uuid():
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Keyset pagination: one (sort column, id) index per sort_by option
+        Index("ix_products_active_created_at_id", "is_active", "created_at", "id"),
+        Index("ix_products_active_price_id", "is_active", "price", "id"),
+        Index("ix_products_active_name_id", "is_active", "name", "id"),
+        # Category pages (list_products?category=...) in the default newest-first order
+        Index("ix_products_active_category_created_at_id", "is_active", "category_id", "created_at", "id"),
+        # Featured products are a small slice of the catalog; index only those rows
+        Index(
+            "ix_products_featured_created_at_id", "created_at", "id",
+            sqlite_where=text("is_active = 1 AND is_featured = 1"),
+            postgresql_where=text("is_active = true AND is_featured = true")
+        ),
+        # Admin low-stock report with an explicit threshold
+        Index("ix_products_active_stock_quantity", "is_active", "stock_quantity"),
+        # Low-stock feed: only products below their own reorder threshold are indexed
+        Index(
+            "ix_products_low_stock", "stock_quantity", "id",
+            sqlite_where=text("is_active = 1 AND stock_quantity > 0 AND stock_quantity < reorder_threshold"),
+            postgresql_where=text("is_active = true AND stock_quantity > 0 AND stock_quantity < reorder_threshold")
+        ),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     name = Column(String(200), nullable=False)
     slug = Column(String(250), unique=True, nullable=False, index=True)
     description = Column(Text)
     brand = Column(String(100), index=True)
-    category_id = Column(String(36), ForeignKey('categories.id'))
+    category_id = Column(String(36), ForeignKey('categories.id'), index=True)
     price = Column(Numeric(10, 2), nullable=False)
     discount_price = Column(Numeric(10, 2))
     stock_quantity = Column(Integer, default=0)
+    # Units held by unexpired checkouts; available = stock_quantity - reserved_quantity
+    reserved_quantity = Column(Integer, nullable=False, default=0, server_default="0")
+    # Stock below this shows up in the low-stock feed and triggers an alert
+    reorder_threshold = Column(Integer, nullable=False, default=settings.LOW_STOCK_THRESHOLD, server_default="10")
     images = Column(JSON)  # Array of image URLs
     is_featured = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
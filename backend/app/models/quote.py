@@ -0,0 +1,42 @@
+from sqlalchemy import Column, String, Numeric, Integer, JSON, ForeignKey, DateTime
+import uuid
+from datetime import datetime
+from app.database import Base
+
+
+def generate_uuid():
+    return str(uuid.uuid4())
+
+
+class CheckoutQuote(Base):
+    """A cart priced at payment-intent time, consumed by create_order.
+
+    ``cart`` holds the serialized PricedCart (lines, stock snapshot and
+    totals) so the order is built from exactly what was quoted.
+    """
+    __tablename__ = "checkout_quotes"
+
+    id = Column(String(255), primary_key=True)  # The payment intent id
+    user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
+    cart = Column(JSON, nullable=False)
+    total_amount = Column(Numeric(10, 2), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class StockHold(Base):
+    """Units of one product set aside for a payment intent until ``expires_at``.
+
+    Each hold is mirrored in ``Product.reserved_quantity``; whoever deletes
+    the hold row (create_order or the expiry sweeper) adjusts the counter.
+    """
+    __tablename__ = "stock_holds"
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    payment_intent_id = Column(String(255), nullable=False, index=True)
+    # The shopper's earlier holds are replaced when they start another checkout
+    user_id = Column(String(36), index=True)
+    product_id = Column(String(36), ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
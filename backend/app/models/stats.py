@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Date, Numeric, Integer
+from app.database import Base
+
+
+class DailyStats(Base):
+    """Per-day rollup of orders and sign-ups that backs the admin dashboard.
+
+    Orders are attributed to the day they were created; status changes move
+    an order between the ``*_orders`` counters of that same day.
+    """
+    __tablename__ = "daily_stats"
+
+    date = Column(Date, primary_key=True)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+    order_count = Column(Integer, nullable=False, default=0)
+    pending_orders = Column(Integer, nullable=False, default=0)
+    paid_orders = Column(Integer, nullable=False, default=0)
+    processing_orders = Column(Integer, nullable=False, default=0)
+    shipped_orders = Column(Integer, nullable=False, default=0)
+    delivered_orders = Column(Integer, nullable=False, default=0)
+    cancelled_orders = Column(Integer, nullable=False, default=0)
+    refunded_orders = Column(Integer, nullable=False, default=0)
+    new_users = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class StockEvent(Base):
+    """A product's move to another stock state, for the admin SSE stream (see app/utils/low_stock.py).
+
+    Written in the same transaction as the stock change, so it exists exactly
+    when the change committed; every worker relays new rows to its own
+    subscribers. Rows are pruned after LOW_STOCK_EVENT_RETENTION_SECONDS.
+    """
+    __tablename__ = "stock_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event = Column(String(20), nullable=False)
+    previous = Column(String(20), nullable=False)
+    product_id = Column(String(36), nullable=False)
+    name = Column(String(200))
+    stock_quantity = Column(Integer, nullable=False)
+    reorder_threshold = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
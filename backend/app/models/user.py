@@ -1,9 +1,14 @@
-from sqlalchemy import Column, String, Boolean, JSON, DateTime
+from sqlalchemy import Column, String, Boolean, JSON, DateTime, Index, event, inspect
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
 from app.database import Base
 
+# Each worker caches these per user (app/dependencies.py); changing them bumps
+# this cache_generations namespace so every worker drops its copies
+AUTH_CACHE_NAMESPACE = "users"
+AUTH_FIELDS = ("is_active", "is_admin")
+
 
 def generate_uuid():
     return str(uuid.uuid4())
@@ -11,6 +16,9 @@ def generate_uuid():
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     email = Column(String(255), unique=True, nullable=False, index=True)
@@ -27,3 +35,21 @@ class User(Base):
 
     # Relationships
     orders = relationship("Order", back_populates="user", cascade="all, delete-orphan")
+
+
+# Here rather than next to the cache so every writer, scripts included, publishes its changes
+def _publish_auth_change(connection) -> None:
+    from app.utils.cache_sync import bump_generation  # imports the models itself
+    bump_generation(connection, AUTH_CACHE_NAMESPACE)
+
+
+@event.listens_for(User, "after_update")
+def _publish_auth_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in AUTH_FIELDS):
+        _publish_auth_change(connection)
+
+
+@event.listens_for(User, "after_delete")
+def _publish_auth_delete(mapper, connection, target):
+    _publish_auth_change(connection)
@@ -1,14 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import asyncio
+import io
+import tempfile
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
 from typing import List, Optional
 from datetime import datetime, timedelta
-from app.database import get_db
-from app.schemas.order import OrderResponse, OrderUpdate
+from app.config import settings
+from app.database import get_db, AsyncSessionLocal
+from app.schemas.order import OrderResponse, OrderSummary, OrderUpdate
+from app.schemas.user import UserResponse
+from app.schemas.product import LowStockResponse, ProductImportResult
 from app.models.order import Order, OrderStatus
 from app.models.product import Product
 from app.models.user import User
+from app.models.stats import DailyStats
 from app.dependencies import get_current_admin
+from app.utils.pagination import paginate, NEXT_CURSOR_HEADER
+from app.utils.serialization import json_response
+from app.utils.sql_stats import slow_queries
+from app.utils.stats import record_order_status_change
+from app.utils.jobs import enqueue
+from app.utils.low_stock import format_sse, low_stock_filter, stock_events
+from app.utils.export import MEDIA_TYPES, export_header, export_line
+from app.utils.order_export import stream_order_export
+from app.utils.product_io import (
+    EXPORT_COLUMNS as PRODUCT_EXPORT_COLUMNS, ProductImporter, category_lookup_query,
+    export_query as product_export_query, read_rows, write_chunk
+)
+from app.routes.products import catalog_sync
 
 router = APIRouter()
 
@@ -16,44 +39,51 @@ router = APIRouter()
 @router.get("/dashboard")
 async def get_dashboard_stats(
     current_user = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get dashboard statistics"""
-    # Total revenue
-    total_revenue = db.query(func.sum(Order.total_amount)).filter(
-        Order.status.in_([OrderStatus.PAID, OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.DELIVERED])
-    ).scalar() or 0
+    """Get dashboard statistics
 
-    # Total orders
-    total_orders = db.query(func.count(Order.id)).scalar() or 0
+    Order figures come from the daily_stats rollup (one row per day), so
+    the dashboard never scans the orders table.
+    """
+    status_columns = {status.value: getattr(DailyStats, f"{status.value}_orders") for status in OrderStatus}
+
+    # Lifetime totals
+    totals = (await db.execute(select(
+        func.coalesce(func.sum(DailyStats.revenue), 0).label('revenue'),
+        func.coalesce(func.sum(DailyStats.order_count), 0).label('orders'),
+        *[func.coalesce(func.sum(column), 0).label(status) for status, column in status_columns.items()]
+    ))).one()
 
     # Total products
-    total_products = db.query(func.count(Product.id)).filter(Product.is_active == True).scalar() or 0
+    total_products = await db.scalar(select(func.count(Product.id)).filter(Product.is_active == True)) or 0
 
     # Total users
-    total_users = db.query(func.count(User.id)).filter(User.is_active == True).scalar() or 0
+    total_users = await db.scalar(select(func.count(User.id)).filter(User.is_active == True)) or 0
 
-    # Recent orders (last 10)
-    recent_orders = db.query(Order).order_by(Order.created_at.desc()).limit(10).all()
+    # Recent orders (last 10), without internal columns such as the idempotency key
+    summary_columns = [getattr(Order, name) for name in OrderSummary.model_fields]
+    recent_orders = (await db.execute(
+        select(Order).options(load_only(*summary_columns)).order_by(Order.created_at.desc()).limit(10)
+    )).scalars().all()
 
     # Revenue trend (last 7 days)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    daily_revenue = db.query(
-        func.date(Order.created_at).label('date'),
-        func.sum(Order.total_amount).label('revenue')
-    ).filter(
-        Order.created_at >= seven_days_ago,
-        Order.status.in_([OrderStatus.PAID, OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.DELIVERED])
-    ).group_by(func.date(Order.created_at)).all()
+    seven_days_ago = (datetime.utcnow() - timedelta(days=7)).date()
+    daily_revenue = (await db.execute(
+        select(DailyStats.date, DailyStats.revenue)
+        .filter(DailyStats.date >= seven_days_ago, DailyStats.revenue != 0)
+        .order_by(DailyStats.date)
+    )).all()
 
     return {
         "stats": {
-            "totalRevenue": float(total_revenue),
-            "totalOrders": total_orders,
+            "totalRevenue": float(totals.revenue),
+            "totalOrders": int(totals.orders),
             "totalProducts": total_products,
-            "totalUsers": total_users
+            "totalUsers": total_users,
+            "ordersByStatus": {status: int(getattr(totals, status)) for status in status_columns}
         },
-        "recentOrders": recent_orders,
+        "recentOrders": [OrderSummary.model_validate(order) for order in recent_orders],
         "revenuetrend": [
             {"date": str(day.date), "revenue": float(day.revenue)}
             for day in daily_revenue
@@ -65,18 +95,49 @@ async def get_dashboard_stats(
 async def list_all_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     status: Optional[OrderStatus] = None,
     current_user = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all orders (Admin only)"""
-    query = db.query(Order)
+    query = select(Order).options(selectinload(Order.items))
 
     if status:
         query = query.filter(Order.status == status)
 
-    orders = query.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
-    return orders
+    orders, next_cursor = await paginate(
+        db, query, Order.created_at, Order.id, limit, cursor=cursor, skip=skip
+    )
+
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return json_response(List[OrderResponse], orders, headers=headers)
+
+
+@router.get("/orders/export")
+async def export_orders(
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status: Optional[OrderStatus] = None,
+    current_user = Depends(get_current_admin)
+):
+    """Stream orders created in ``[start, end)`` as CSV or NDJSON (Admin only)
+
+    One record per order item, with the order's columns repeated.
+    """
+    rows = stream_order_export(
+        format,
+        start=start,
+        end=end,
+        status=status.value if status else None,
+        batch_size=settings.ORDER_EXPORT_BATCH_SIZE
+    )
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'}
+    )
 
 
 @router.put("/orders/{order_id}/status", response_model=OrderResponse)
@@ -84,16 +145,21 @@ async def update_order_status(
     order_id: str,
     order_update: OrderUpdate,
     current_user = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update order status (Admin only)"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = (await db.execute(
+        select(Order).options(selectinload(Order.items)).filter(Order.id == order_id)
+    )).scalars().first()
 
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
     # Update status
+    newly_shipped = False
     if order_update.status:
+        await record_order_status_change(db, order, order.status, order_update.status)
+        newly_shipped = order_update.status == OrderStatus.SHIPPED and order.status != OrderStatus.SHIPPED
         order.status = order_update.status
 
         # Update timestamps based on status
@@ -110,39 +176,181 @@ async def update_order_status(
     if order_update.notes:
         order.notes = order_update.notes
 
-    db.commit()
-    db.refresh(order)
+    if newly_shipped:
+        enqueue(db, "shipping_notification", order_id=order.id)
+
+    await db.commit()
 
     return order
 
 
-@router.get("/users", response_model=List)
+@router.get("/users", response_model=List[UserResponse])
 async def list_all_users(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all users (Admin only)"""
-    users = db.query(User).offset(skip).limit(limit).all()
+    users, next_cursor = await paginate(
+        db, select(User), User.created_at, User.id, limit, cursor=cursor, skip=skip
+    )
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return users
 
 
-@router.get("/products/low-stock")
+@router.get("/products/low-stock", response_model=LowStockResponse)
 async def get_low_stock_products(
-    threshold: int = Query(10, ge=0),
+    response: Response,
+    threshold: Optional[int] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     current_user = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get products with low stock (Admin only)"""
-    products = db.query(Product).filter(
-        Product.stock_quantity < threshold,
-        Product.stock_quantity > 0,
-        Product.is_active == True
-    ).all()
+    """Get products with low stock, lowest first (Admin only)
 
+    Without ``threshold`` each product's own reorder threshold applies and
+    the query reads only the ix_products_low_stock partial index.
+    """
+    query = select(Product).options(load_only(
+        Product.id, Product.name, Product.slug, Product.brand, Product.images,
+        Product.stock_quantity, Product.reserved_quantity, Product.reorder_threshold
+    )).filter(low_stock_filter(threshold))
+    products, next_cursor = await paginate(
+        db, query, Product.stock_quantity, Product.id, limit, descending=False, cursor=cursor
+    )
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return {
         "products": products,
         "count": len(products),
         "threshold": threshold
     }
+
+
+@router.get("/products/low-stock/stream")
+async def stream_low_stock_events(
+    request: Request,
+    current_user = Depends(get_current_admin)
+):
+    """Server-sent events whenever a product changes stock state (Admin only)
+
+    Events are named ``low_stock``, ``out_of_stock``, ``in_stock`` or
+    ``inactive``; the data is the product's id, name, stock and threshold.
+    """
+    async def events():
+        with stock_events.subscribe() as queue:
+            while not await request.is_disconnected():
+                try:
+                    stock_event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.LOW_STOCK_STREAM_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(stock_event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/products/import", response_model=ProductImportResult)
+async def import_products(
+    request: Request,
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    current_user = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Bulk upsert products from a CSV or NDJSON request body (Admin only)
+
+    Rows are matched on ``slug`` and reference their category by
+    ``category_slug`` (or ``category_id``). Valid rows are written in
+    chunks, each committed on its own; invalid rows are skipped and listed
+    in the report with their line number.
+    """
+    # Spool the upload so parsing never holds the whole feed in memory
+    upload = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    try:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        stream = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+
+        categories = dict((await db.execute(category_lookup_query())).all())
+        importer = ProductImporter(
+            categories,
+            chunk_size=settings.PRODUCT_IMPORT_CHUNK_SIZE,
+            max_errors=settings.PRODUCT_IMPORT_MAX_ERRORS
+        )
+        chunks = importer.chunks(read_rows(stream, format))
+
+        while True:
+            # Parsing and validation are CPU-bound; keep them off the event loop
+            values = await run_in_threadpool(next, chunks, None)
+            if values is None:
+                break
+            await db.run_sync(write_chunk, values)
+            await db.commit()
+    finally:
+        upload.close()
+
+    if importer.imported:
+        catalog_sync.invalidate()
+    return importer.report()
+
+
+@router.get("/products/export")
+async def export_products(
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    current_user = Depends(get_current_admin)
+):
+    """Stream the full catalog as CSV or NDJSON (Admin only)
+
+    The output can be fed back to ``/products/import`` unchanged.
+    """
+    async def rows():
+        # The request's session is closed before a streamed body is sent, so use our own
+        async with AsyncSessionLocal() as db:
+            yield export_header(format, PRODUCT_EXPORT_COLUMNS)
+            result = await db.stream(product_export_query().execution_options(yield_per=1000))
+            async for partition in result.partitions():
+                yield "".join(export_line(format, PRODUCT_EXPORT_COLUMNS, row._mapping) for row in partition)
+
+    return StreamingResponse(
+        rows(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'}
+    )
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    current_user = Depends(get_current_admin)
+):
+    """Most recent statements slower than SLOW_QUERY_THRESHOLD_MS, newest first (Admin only)
+
+    Kept in memory by each API process; statement text only, no parameters.
+    """
+    entries = slow_queries.entries()
+    return {
+        "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+        "count": len(entries),
+        "queries": entries[:limit]
+    }
+
+
+@router.delete("/slow-queries", status_code=204)
+async def clear_slow_queries(current_user = Depends(get_current_admin)):
+    """Empty the slow-query log (Admin only)"""
+    slow_queries.clear()
@@ -1,77 +1,208 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Dict, Optional
+from datetime import datetime, timedelta
+import hashlib
+import json
 import uuid
 from app.database import get_db
 from app.schemas.order import OrderResponse, OrderCreate, PaymentIntentCreate, PaymentIntentResponse
 from app.models.order import Order, OrderItem, OrderStatus
 from app.models.product import Product
-from app.models.user import User
+from app.models.quote import CheckoutQuote
+from app.schemas.user import CurrentUser
 from app.dependencies import get_current_active_user
 from app.config import settings
+from app.utils.stats import record_order_created
+from app.utils.pricing import CheckoutError, PricedCart, price_cart
+from app.utils.reservations import available_quantity, release_holds, reserve_stock, take_stock
+from app.utils.jobs import enqueue
+from app.utils.serialization import json_response
+from app.utils.metrics import ORDERS_CREATED, record_checkout_failure
+from app.utils.low_stock import record_stock_change, stock_state
+from app.routes.products import catalog_sync
 
 router = APIRouter()
 
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+async def _load_cart_products(db: AsyncSession, items, lock: bool = False) -> Dict[str, Product]:
+    """Load every product in the cart with a single IN query.
+
+    With ``lock`` the rows are selected FOR UPDATE (a no-op on SQLite) in id
+    order, so concurrent checkouts of overlapping carts can't deadlock.
+    Raises 404 for the first product that doesn't exist.
+    """
+    product_ids = sorted({str(item.product_id) for item in items})
+    query = select(Product).filter(Product.id.in_(product_ids)).order_by(Product.id)
+    if lock:
+        query = query.with_for_update()
+    result = await db.execute(query)
+    products = {product.id: product for product in result.scalars().all()}
+
+    for item in items:
+        if str(item.product_id) not in products:
+            raise CheckoutError(404, f"Product {item.product_id} not found", reason="not_found")
+
+    return products
+
+
+async def _get_order(db: AsyncSession, order_id: str, user_id: str = None) -> Order:
+    """Load an order with its items, optionally scoped to one user"""
+    query = (
+        select(Order)
+        .options(selectinload(Order.items))
+        .filter(Order.id == order_id)
+        .execution_options(populate_existing=True)
+    )
+    if user_id is not None:
+        query = query.filter(Order.user_id == user_id)
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
+def _request_fingerprint(order_data: OrderCreate) -> str:
+    """Stable hash of a create_order body, to tell a retry from a reused key"""
+    payload = json.dumps(order_data.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def _find_idempotent_order(db: AsyncSession, user_id: str, key: str) -> Optional[Order]:
+    result = await db.execute(
+        select(Order)
+        .options(selectinload(Order.items))
+        .filter(Order.user_id == user_id, Order.idempotency_key == key)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+def _replay(order: Order, fingerprint: str, response: Response) -> Order:
+    """Answer a retry with the order it already created"""
+    if order.request_fingerprint and order.request_fingerprint != fingerprint:
+        raise HTTPException(
+            status_code=422,
+            detail=f"{IDEMPOTENCY_HEADER} was already used for a different order"
+        )
+    response.headers[REPLAYED_HEADER] = "true"
+    return order
+
+
+async def _payment_intent_used(db: AsyncSession, payment_intent_id: str) -> bool:
+    result = await db.execute(select(Order.id).filter(Order.stripe_payment_intent_id == payment_intent_id))
+    return result.first() is not None
+
+
+def _order_error(exc: Exception) -> HTTPException:
+    record_checkout_failure("order", "error")
+    return HTTPException(
+        status_code=500,
+        detail=f"Error creating order: {str(exc)}"
+    )
+
+
+def _cart_quantities(items) -> Dict[str, int]:
+    """Total quantity per product, merging repeated cart lines"""
+    quantities: Dict[str, int] = {}
+    for item in items:
+        product_id = str(item.product_id)
+        quantities[product_id] = quantities.get(product_id, 0) + item.quantity
+    return quantities
+
+
+async def _price_cart(db: AsyncSession, items, lock: bool = False) -> PricedCart:
+    """Load the cart's products, check stock and price it"""
+    products = await _load_cart_products(db, items, lock=lock)
+
+    for product_id, quantity in _cart_quantities(items).items():
+        product = products[product_id]
+        available = available_quantity(product)
+        if available < quantity:
+            raise CheckoutError(
+                400, f"Insufficient stock for {product.name}. Available: {max(available, 0)}", reason="stock"
+            )
+
+    return price_cart(items, products)
+
+
+async def _get_quote(db: AsyncSession, order_data: OrderCreate, user_id: str) -> Optional[CheckoutQuote]:
+    """The live quote for this order's payment intent, if there is one.
+
+    A missing or expired quote returns None and the cart is priced afresh.
+    """
+    if not order_data.payment_intent_id:
+        return None
+
+    quote = await db.get(CheckoutQuote, order_data.payment_intent_id)
+    if quote is None or quote.expires_at <= datetime.utcnow():
+        return None
+    if quote.user_id != user_id:
+        raise CheckoutError(400, "Invalid payment intent", reason="invalid_payment_intent")
+
+    quoted = PricedCart.model_validate(quote.cart).quantities()
+    if quoted != _cart_quantities(order_data.items):
+        raise CheckoutError(400, "Cart has changed since the payment intent was created", reason="cart_changed")
+    return quote
+
 
 @router.post("/create-payment-intent", response_model=PaymentIntentResponse)
 async def create_payment_intent(
     order_data: PaymentIntentCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create Stripe payment intent for checkout"""
     try:
-        # Validate and calculate order amount
-        total_amount = 0
-        order_items = []
-
-        for item in order_data.items:
-            product = db.query(Product).filter(Product.id == item.product_id).first()
-            if not product:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Product {item.product_id} not found"
-                )
-
-            # Check stock availability
-            if product.stock_quantity < item.quantity:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Insufficient stock for {product.name}. Available: {product.stock_quantity}"
-                )
-
-            price = float(product.discount_price or product.price)
-            total_amount += price * item.quantity
-
-            order_items.append({
-                "product_id": str(product.id),
-                "name": product.name,
-                "quantity": item.quantity,
-                "price": price
-            })
-
-        # Add shipping and tax
-        shipping_cost = 10.00 if total_amount < 100 else 0
-        tax_rate = 0.08  # 8% tax
-        tax_amount = total_amount * tax_rate
-        final_amount = total_amount + shipping_cost + tax_amount
+        cart = await _price_cart(db, order_data.items)
 
         # For now, return mock payment intent (Stripe integration can be added later)
         mock_intent_id = f"pi_{uuid.uuid4().hex[:24]}"
 
+        # Hold the units while the customer pays, replacing any earlier
+        # checkout's holds. Committed at once: the products stay locked until then
+        now = datetime.utcnow()
+        await reserve_stock(
+            db, mock_intent_id, current_user.id, cart,
+            expires_at=now + timedelta(seconds=settings.STOCK_HOLD_TTL_SECONDS)
+        )
+        await db.commit()
+
+        # Keep the priced cart so create_order doesn't have to redo it
+        try:
+            db.add(CheckoutQuote(
+                id=mock_intent_id,
+                user_id=current_user.id,
+                cart=cart.model_dump(mode="json"),
+                total_amount=cart.total,
+                created_at=now,
+                expires_at=now + timedelta(seconds=settings.CHECKOUT_QUOTE_TTL_SECONDS)
+            ))
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            await release_holds(db, mock_intent_id)
+            await db.commit()
+            raise
+
         return {
             "clientSecret": f"{mock_intent_id}_secret",
             "paymentIntentId": mock_intent_id,
-            "amount": final_amount,
-            "subtotal": total_amount,
-            "shipping": shipping_cost,
-            "tax": tax_amount
+            "amount": cart.total,
+            "subtotal": cart.subtotal,
+            "shipping": cart.shipping,
+            "tax": cart.tax
         }
 
-    except HTTPException:
+    except HTTPException as e:
+        record_checkout_failure("payment_intent", getattr(e, "reason", "invalid"))
         raise
     except Exception as e:
+        record_checkout_failure("payment_intent", "error")
         raise HTTPException(
             status_code=500,
             detail=f"Error creating payment intent: {str(e)}"
@@ -81,32 +212,33 @@ async def create_payment_intent(
 @router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: OrderCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Create order after successful payment"""
+    """Create order after successful payment
+
+    Retry-safe: requests are keyed on the ``Idempotency-Key`` header, or the
+    payment intent id when there is none. A retry returns the original
+    order (with ``Idempotent-Replayed: true``) without touching stock.
+    """
+    key = idempotency_key or order_data.payment_intent_id
+    fingerprint = _request_fingerprint(order_data)
+
+    if key:
+        existing = await _find_idempotent_order(db, current_user.id, key)
+        if existing:
+            return _replay(existing, fingerprint, response)
+
     try:
-        # Calculate order totals
-        subtotal = 0
-        for item in order_data.items:
-            product = db.query(Product).filter(Product.id == item.product_id).first()
-            if not product:
-                raise HTTPException(status_code=404, detail=f"Product {item.product_id} not found")
-
-            # Check stock
-            if product.stock_quantity < item.quantity:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Insufficient stock for {product.name}"
-                )
-
-            price = float(product.discount_price or product.price)
-            subtotal += price * item.quantity
-
-        # Calculate shipping and tax
-        shipping_cost = 10.00 if subtotal < 100 else 0
-        tax_amount = subtotal * 0.08
-        total_amount = subtotal + shipping_cost + tax_amount
+        quote = await _get_quote(db, order_data, current_user.id)
+        if quote is not None:
+            # Priced at payment-intent time; only stock needs checking again
+            cart = PricedCart.model_validate(quote.cart)
+            await db.delete(quote)
+        else:
+            cart = await _price_cart(db, order_data.items, lock=True)
 
         # Generate order number
         order_number = f"ORD-{datetime.utcnow().strftime('%Y%m%d')}-{uuid.uuid4().hex[:8].upper()}"
@@ -115,13 +247,15 @@ async def create_order(
         new_order = Order(
             user_id=current_user.id,
             order_number=order_number,
-            total_amount=total_amount,
-            subtotal=subtotal,
-            shipping_cost=shipping_cost,
-            tax_amount=tax_amount,
+            total_amount=cart.total,
+            subtotal=cart.subtotal,
+            shipping_cost=cart.shipping,
+            tax_amount=cart.tax,
             status=OrderStatus.PAID,
             payment_method="stripe",
             stripe_payment_intent_id=order_data.payment_intent_id,
+            idempotency_key=key,
+            request_fingerprint=fingerprint,
             shipping_address=order_data.shipping_address,
             billing_address=order_data.billing_address or order_data.shipping_address,
             notes=order_data.notes,
@@ -129,65 +263,92 @@ async def create_order(
         )
 
         db.add(new_order)
-        db.flush()
-
-        # Create order items and update inventory
-        for item in order_data.items:
-            product = db.query(Product).filter(Product.id == item.product_id).first()
+        # Flushed before any stock update: a concurrent duplicate fails here
+        await db.flush()
+        await record_order_created(db, new_order)
 
+        # Create order items
+        for line in cart.lines:
             order_item = OrderItem(
                 order_id=new_order.id,
-                product_id=product.id,
-                quantity=item.quantity,
-                price=product.discount_price or product.price,
-                product_name=product.name,
-                product_image=product.images[0] if product.images else None
+                product_id=line.product_id,
+                quantity=line.quantity,
+                price=line.unit_price,
+                product_name=line.product_name,
+                product_image=line.product_image
             )
 
             db.add(order_item)
 
-            # Update stock
-            product.stock_quantity -= item.quantity
+        # Convert the payment intent's holds into the sale; units whose hold
+        # lapsed must still be available
+        remaining = await take_stock(db, cart, order_data.payment_intent_id)
+
+        # Side effects run after commit, outside the checkout request
+        enqueue(db, "order_confirmation", order_id=new_order.id)
+        quantities = cart.quantities()
+        for product_id, (stock, threshold) in remaining.items():
+            record_stock_change(
+                db, product_id, cart.product_name(product_id),
+                stock_state(stock + quantities[product_id], threshold), stock, threshold
+            )
 
-        db.commit()
-        db.refresh(new_order)
+        await db.commit()
+        ORDERS_CREATED.inc()
+        # Cached listings may show a lower stock_quantity until they expire, but
+        # a product that sold out must leave the in_stock filter at once
+        if any(stock <= 0 for stock, _ in remaining.values()):
+            catalog_sync.invalidate()
 
-        return new_order
+        return await _get_order(db, new_order.id)
 
-    except HTTPException:
-        db.rollback()
+    except HTTPException as e:
+        await db.rollback()
+        record_checkout_failure("order", getattr(e, "reason", "invalid"))
         raise
+    except IntegrityError as e:
+        await db.rollback()
+        # Lost a race with a concurrent retry of the same request
+        existing = await _find_idempotent_order(db, current_user.id, key) if key else None
+        if existing:
+            return _replay(existing, fingerprint, response)
+        if order_data.payment_intent_id and await _payment_intent_used(db, order_data.payment_intent_id):
+            record_checkout_failure("order", "payment_intent_used")
+            raise HTTPException(
+                status_code=409,
+                detail="Payment intent has already been used for another order"
+            )
+        raise _order_error(e)
     except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error creating order: {str(e)}"
-        )
+        await db.rollback()
+        raise _order_error(e)
 
 
 @router.get("/", response_model=List[OrderResponse])
 async def list_orders(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get user's orders"""
-    orders = db.query(Order).filter(Order.user_id == current_user.id).order_by(Order.created_at.desc()).all()
-    return orders
+    result = await db.execute(
+        select(Order)
+        .options(selectinload(Order.items))
+        .filter(Order.user_id == current_user.id)
+        .order_by(Order.created_at.desc())
+    )
+    return json_response(List[OrderResponse], result.scalars().all())
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get order details"""
-    order = db.query(Order).filter(
-        Order.id == order_id,
-        Order.user_id == current_user.id
-    ).first()
+    order = await _get_order(db, order_id, user_id=current_user.id)
 
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    return order
+    return json_response(OrderResponse, order)
@@ -1,44 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.database import get_db
-from app.schemas.product import ProductResponse, ProductCreate, ProductUpdate, CategoryResponse, CategoryCreate
+from app.schemas.product import (
+    ProductResponse, ProductCreate, ProductUpdate, CategoryResponse, CategoryCreate, CategoryTreeNode
+)
 from app.models.product import Product
-from app.models.category import Category
+from app.models.category import Category, CategoryClosure
 from app.dependencies import get_current_admin
+from app.utils.search import apply_search
+from app.utils.pagination import paginate, NEXT_CURSOR_HEADER
+from app.utils.projection import columns, parse_fields, partial_model
+from app.utils.cache import TTLCache
+from app.utils.http_cache import ResponseCache
+from app.utils.cache_sync import CacheSync
+from app.utils.low_stock import record_stock_change, stock_state
+from app.config import settings
 
 router = APIRouter()
 
+# Public catalog reads; every product/category write and every order (stock) invalidates it,
+# in all workers through catalog_sync
+catalog_cache = ResponseCache(
+    TTLCache(maxsize=settings.CATALOG_CACHE_MAX_SIZE, ttl=settings.CATALOG_CACHE_TTL_SECONDS),
+    namespace="catalog",
+    max_age=settings.CATALOG_CACHE_MAX_AGE
+)
+catalog_sync = CacheSync(catalog_cache.namespace, catalog_cache.invalidate)
+
 
 # Product Endpoints
 @router.get("/", response_model=List[ProductResponse])
 async def list_products(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
     category: Optional[str] = None,
+    include_descendants: bool = False,
     brand: Optional[str] = None,
     min_price: Optional[float] = Query(None, ge=0),
     max_price: Optional[float] = Query(None, ge=0),
     is_featured: Optional[bool] = None,
     in_stock: Optional[bool] = None,
-    sort_by: Optional[str] = Query("created_at", regex="^(price|name|created_at)$"),
+    sort_by: Optional[str] = Query(None, regex="^(relevance|price|name|created_at)$"),
     sort_order: Optional[str] = Query("desc", regex="^(asc|desc)$"),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,name,price,images"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """List products with pagination and filtering"""
-    query = db.query(Product).filter(Product.is_active == True)
+    """List products with pagination and filtering
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch
+    the next page without an OFFSET scan. Only the columns of the response
+    (or of ``fields``) are selected.
+    """
+    cached, cache_key = catalog_cache.lookup(request)
+    if cached is not None:
+        return cached
+
+    names = parse_fields(fields, ProductResponse)
+    response_type = List[partial_model(ProductResponse, names)]
+    sort_column = getattr(Product, sort_by) if sort_by in ("price", "name", "created_at") else Product.created_at
+
+    # Plain rows, not ORM objects; the sort column and id are always
+    # selected because the next cursor is built from them
+    query = select(*columns(Product, names, sort_column, Product.id)).filter(Product.is_active == True)
+
+    # Searches default to relevance order
+    ranked = bool(search) and (sort_by or "relevance") == "relevance"
 
     # Apply filters
-    if category:
+    if category and include_descendants:
+        # Products anywhere under the category: one indexed join on the closure table
+        query = query.join(CategoryClosure, CategoryClosure.descendant_id == Product.category_id).filter(
+            CategoryClosure.ancestor_id == category
+        )
+    elif category:
         query = query.filter(Product.category_id == category)
     if brand:
         query = query.filter(Product.brand.ilike(f"%{brand}%"))
     if search:
-        query = query.filter(
-            (Product.name.ilike(f"%{search}%")) |
-            (Product.description.ilike(f"%{search}%"))
-        )
+        query = apply_search(query, search, db.bind.dialect.name, ranked=ranked)
     if min_price is not None:
         query = query.filter(Product.price >= min_price)
     if max_price is not None:
@@ -48,47 +92,68 @@ async def list_products(
     if in_stock:
         query = query.filter(Product.stock_quantity > 0)
 
-    # Apply sorting
-    if sort_order == "asc":
-        query = query.order_by(getattr(Product, sort_by).asc())
-    else:
-        query = query.order_by(getattr(Product, sort_by).desc())
+    # Relevance scores can't be keyed on, so ranked searches page by offset
+    if ranked:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported for relevance sorting")
+        result = await db.execute(
+            query.order_by(Product.created_at.desc(), Product.id.desc()).offset(skip).limit(limit)
+        )
+        return catalog_cache.store(request, cache_key, response_type, result.all())
+
+    # Apply sorting and pagination
+    products, next_cursor = await paginate(
+        db,
+        query,
+        sort_column,
+        Product.id,
+        limit,
+        descending=sort_order == "desc",
+        cursor=cursor,
+        skip=skip,
+        scalars=False
+    )
 
-    # Pagination
-    products = query.offset(skip).limit(limit).all()
-    return products
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return catalog_cache.store(request, cache_key, response_type, products, headers)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: str, db: Session = Depends(get_db)):
+async def get_product(product_id: str, request: Request, db: AsyncSession = Depends(get_db)):
     """Get single product by ID or slug"""
-    product = db.query(Product).filter(
+    cached, cache_key = catalog_cache.lookup(request)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(select(Product).filter(
         ((Product.id == product_id) | (Product.slug == product_id)) &
         (Product.is_active == True)
-    ).first()
+    ))
+    product = result.scalars().first()
 
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    return product
+    return catalog_cache.store(request, cache_key, ProductResponse, product)
 
 
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def create_product(
     product: ProductCreate,
     current_user = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new product (Admin only)"""
     # Check if slug already exists
-    existing = db.query(Product).filter(Product.slug == product.slug).first()
+    existing = (await db.execute(select(Product.id).filter(Product.slug == product.slug))).first()
     if existing:
         raise HTTPException(status_code=400, detail="Product slug already exists")
 
     new_product = Product(**product.model_dump())
     db.add(new_product)
-    db.commit()
-    db.refresh(new_product)
+    await db.commit()
+    await db.refresh(new_product)
+    catalog_sync.invalidate()
 
     return new_product
 
@@ -98,20 +163,26 @@ async def update_product(
     product_id: str,
     product: ProductUpdate,
     current_user = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update product (Admin only)"""
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+    db_product = await db.get(Product, product_id)
 
     if not db_product:
         raise HTTPException(status_code=404, detail="Product not found")
 
+    old_state = stock_state(db_product.stock_quantity, db_product.reorder_threshold, db_product.is_active)
     update_data = product.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_product, field, value)
 
-    db.commit()
-    db.refresh(db_product)
+    record_stock_change(
+        db, db_product.id, db_product.name, old_state,
+        db_product.stock_quantity, db_product.reorder_threshold, db_product.is_active
+    )
+    await db.commit()
+    await db.refresh(db_product)
+    catalog_sync.invalidate()
 
     return db_product
 
@@ -120,16 +191,17 @@ async def update_product(
 async def delete_product(
     product_id: str,
     current_user = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete product (Admin only)"""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
 
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    db.delete(product)
-    db.commit()
+    await db.delete(product)
+    await db.commit()
+    catalog_sync.invalidate()
 
     return None
 
@@ -137,30 +209,84 @@ async def delete_product(
 # Category Endpoints
 @router.get("/categories/", response_model=List[CategoryResponse])
 async def list_categories(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """List all categories"""
-    categories = db.query(Category).offset(skip).limit(limit).all()
-    return categories
+    cached, cache_key = catalog_cache.lookup(request)
+    if cached is not None:
+        return cached
+
+    categories, next_cursor = await paginate(
+        db,
+        select(Category),
+        Category.name,
+        Category.id,
+        limit,
+        descending=False,
+        cursor=cursor,
+        skip=skip
+    )
+
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return catalog_cache.store(request, cache_key, List[CategoryResponse], categories, headers)
+
+
+@router.get("/categories/tree", response_model=List[CategoryTreeNode])
+async def get_category_tree(request: Request, db: AsyncSession = Depends(get_db)):
+    """All categories as a nested tree, with active product counts per subtree"""
+    cached, cache_key = catalog_cache.lookup(request)
+    if cached is not None:
+        return cached
+
+    counts = (
+        select(CategoryClosure.ancestor_id, func.count(Product.id).label("product_count"))
+        .join(Product, Product.category_id == CategoryClosure.descendant_id)
+        .filter(Product.is_active == True)
+        .group_by(CategoryClosure.ancestor_id)
+        .subquery()
+    )
+    rows = (await db.execute(
+        select(
+            Category.id, Category.name, Category.slug, Category.image, Category.parent_id,
+            func.coalesce(counts.c.product_count, 0).label("product_count")
+        )
+        .outerjoin(counts, counts.c.ancestor_id == Category.id)
+        .order_by(Category.name, Category.id)
+    )).mappings().all()
+
+    # Assemble in memory; rows arrive sorted, so siblings stay in name order
+    nodes = {row["id"]: {**row, "children": []} for row in rows}
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node["parent_id"])
+        (parent["children"] if parent else roots).append(node)
+
+    return catalog_cache.store(request, cache_key, List[CategoryTreeNode], roots)
 
 
 @router.post("/categories/", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 async def create_category(
     category: CategoryCreate,
     current_user = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new category (Admin only)"""
     # Check if slug already exists
-    existing = db.query(Category).filter(Category.slug == category.slug).first()
+    existing = (await db.execute(select(Category.id).filter(Category.slug == category.slug))).first()
     if existing:
         raise HTTPException(status_code=400, detail="Category slug already exists")
+    parent_id = str(category.parent_id) if category.parent_id else None
+    if parent_id and await db.get(Category, parent_id) is None:
+        raise HTTPException(status_code=400, detail="Parent category not found")
 
-    new_category = Category(**category.model_dump())
+    new_category = Category(**category.model_dump(exclude={"parent_id"}), parent_id=parent_id)
     db.add(new_category)
-    db.commit()
-    db.refresh(new_category)
+    await db.commit()
+    await db.refresh(new_category)
+    catalog_sync.invalidate()
 
     return new_category
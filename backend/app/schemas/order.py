@@ -2,7 +2,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
-from decimal import Decimal
+from app.utils.serialization import Money
 from app.models.order import OrderStatus
 
 
@@ -21,7 +21,7 @@ class OrderItemResponse(BaseModel):
     product_name: str
     product_image: Optional[str]
     quantity: int
-    price: Decimal
+    price: Money
 
     class Config:
         from_attributes = True
@@ -48,11 +48,11 @@ class OrderResponse(BaseModel):
     id: UUID
     user_id: UUID
     order_number: str
-    total_amount: Decimal
-    subtotal: Decimal
-    discount_amount: Decimal
-    tax_amount: Decimal
-    shipping_cost: Decimal
+    total_amount: Money
+    subtotal: Money
+    discount_amount: Money
+    tax_amount: Money
+    shipping_cost: Money
     status: OrderStatus
     payment_method: Optional[str]
     stripe_payment_intent_id: Optional[str]
@@ -70,6 +70,33 @@ class OrderResponse(BaseModel):
         from_attributes = True
 
 
+class OrderSummary(BaseModel):
+    """An order without its items, as listed on the admin dashboard"""
+    id: UUID
+    user_id: UUID
+    order_number: str
+    total_amount: Money
+    subtotal: Money
+    discount_amount: Money
+    tax_amount: Money
+    shipping_cost: Money
+    status: OrderStatus
+    payment_method: Optional[str]
+    stripe_payment_intent_id: Optional[str]
+    shipping_address: Optional[dict]
+    billing_address: Optional[dict]
+    notes: Optional[str]
+    tracking_number: Optional[str]
+    created_at: datetime
+    updated_at: Optional[datetime]
+    paid_at: Optional[datetime]
+    shipped_at: Optional[datetime]
+    delivered_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
 class PaymentIntentCreate(BaseModel):
     items: List[OrderItemCreate]
     shipping_address: dict
@@ -78,7 +105,7 @@ class PaymentIntentCreate(BaseModel):
 class PaymentIntentResponse(BaseModel):
     clientSecret: str
     paymentIntentId: str
-    amount: Decimal
-    subtotal: Decimal
-    shipping: Decimal
-    tax: Decimal
+    amount: Money
+    subtotal: Money
+    shipping: Money
+    tax: Money
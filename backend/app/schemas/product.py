@@ -3,6 +3,8 @@ from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
 from decimal import Decimal
+from app.utils.serialization import Money
+from app.config import settings
 
 
 class ProductBase(BaseModel):
@@ -14,6 +16,7 @@ class ProductBase(BaseModel):
     price: Decimal = Field(..., gt=0)
     discount_price: Optional[Decimal] = Field(None, gt=0)
     stock_quantity: int = Field(default=0, ge=0)
+    reorder_threshold: int = Field(default=settings.LOW_STOCK_THRESHOLD, ge=0)
     images: List[str] = []
     is_featured: bool = False
     additional_info: Optional[dict] = None
@@ -30,12 +33,32 @@ class ProductCreate(ProductBase):
     pass
 
 
+class ProductImportRow(ProductCreate):
+    # Feed rows list what is on sale, so a new product is active unless the row says otherwise
+    is_active: bool = True
+
+
+class ProductImportError(BaseModel):
+    line: int
+    slug: Optional[str] = None
+    errors: List[str]
+
+
+class ProductImportResult(BaseModel):
+    processed: int
+    imported: int
+    failed: int
+    errors: List[ProductImportError]
+    errors_truncated: bool
+
+
 class ProductUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     price: Optional[Decimal] = Field(None, gt=0)
     discount_price: Optional[Decimal] = Field(None, gt=0)
     stock_quantity: Optional[int] = Field(None, ge=0)
+    reorder_threshold: Optional[int] = Field(None, ge=0)
     images: Optional[List[str]] = None
     is_featured: Optional[bool] = None
     is_active: Optional[bool] = None
@@ -49,8 +72,8 @@ class ProductResponse(BaseModel):
     description: Optional[str]
     brand: str
     category_id: UUID
-    price: Decimal
-    discount_price: Optional[Decimal]
+    price: Money
+    discount_price: Optional[Money]
     images: List[str]
     stock_quantity: int
     is_featured: bool
@@ -61,6 +84,26 @@ class ProductResponse(BaseModel):
         from_attributes = True
 
 
+class LowStockProduct(BaseModel):
+    id: UUID
+    name: str
+    slug: str
+    brand: str
+    images: List[str]
+    stock_quantity: int
+    reserved_quantity: int
+    reorder_threshold: int
+
+    class Config:
+        from_attributes = True
+
+
+class LowStockResponse(BaseModel):
+    products: List[LowStockProduct]
+    count: int
+    threshold: Optional[int]  # None when each product's own reorder threshold applies
+
+
 class CategoryBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
     slug: str = Field(..., max_length=120)
@@ -81,3 +124,12 @@ class CategoryResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CategoryTreeNode(BaseModel):
+    id: UUID
+    name: str
+    slug: str
+    image: Optional[str]
+    product_count: int  # Active products in this category and all below it
+    children: List["CategoryTreeNode"] = []
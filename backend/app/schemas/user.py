@@ -47,5 +47,12 @@ class Token(BaseModel):
     user: UserResponse
 
 
+class CurrentUser(BaseModel):
+    """Subset of the user record that authentication and authorization need"""
+    id: str
+    is_active: bool
+    is_admin: bool
+
+
 class TokenData(BaseModel):
     user_id: Optional[str] = None
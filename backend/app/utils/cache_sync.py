@@ -0,0 +1,91 @@
+"""Cross-worker invalidation for the in-process caches.
+
+Each worker (gunicorn process, or server instance) caches catalog
+responses and authenticated users in its own memory, so emptying a cache
+only affects the worker that made the write. ``CacheSync`` carries
+invalidations to the others through the ``cache_generations`` table:
+``invalidate()`` empties this worker's cache at once and marks a pending
+bump, and a background task bumps the namespace's counter and reads it back
+every interval. A worker that sees the counter move empties its cache.
+
+Writes are batched into one UPDATE per worker per interval, off the
+request path, so a burst of checkouts doesn't queue on the counter row.
+Other workers may serve the old entries for up to about two intervals.
+
+Writers that must reach the workers from another process (scripts, where no
+sync task runs) call ``bump_generation`` inside their own transaction instead.
+"""
+import asyncio
+import logging
+from typing import Callable, Optional
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.database import async_engine
+from app.models.cache import CacheGeneration
+
+logger = logging.getLogger(__name__)
+
+_table = CacheGeneration.__table__
+
+
+def bump_generation(connection, namespace: str) -> None:
+    """Tell every worker to empty ``namespace``, when the caller's transaction commits (sync connection)"""
+    increment = update(_table).where(_table.c.namespace == namespace).values(generation=_table.c.generation + 1)
+    if connection.execute(increment).rowcount:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(insert(_table).values(namespace=namespace, generation=1))
+    except IntegrityError:
+        # Another transaction created the row first
+        connection.execute(increment)
+
+
+class CacheSync:
+    def __init__(self, namespace: str, clear: Callable[[], None]):
+        self.namespace = namespace
+        self.clear = clear
+        self._pending = False
+        self._seen: Optional[int] = None
+
+    def invalidate(self) -> None:
+        """Make every cached entry stale, here now and in the other workers shortly"""
+        self.clear()
+        self._pending = True
+
+    async def sync(self) -> None:
+        """Publish a pending invalidation, then pick up any from other workers"""
+        published, self._pending = self._pending, False
+        namespace = _table.c.namespace == self.namespace
+        try:
+            async with async_engine.begin() as conn:
+                if published:
+                    bumped = await conn.execute(
+                        update(_table).where(namespace).values(generation=_table.c.generation + 1)
+                    )
+                    if not bumped.rowcount:
+                        await conn.execute(insert(_table).values(namespace=self.namespace, generation=1))
+                generation = await conn.scalar(select(_table.c.generation).where(namespace)) or 0
+        except BaseException:
+            # Another worker created the row first (IntegrityError), or we were interrupted: retry next time
+            self._pending = self._pending or published
+            raise
+
+        # Our own bump accounts for one step; anything beyond that came from another worker
+        expected = (self._seen or 0) + (1 if published else 0)
+        if self._seen is not None and generation != expected:
+            self.clear()
+        self._seen = generation
+
+    async def run(self, interval: float) -> None:
+        """Sync every ``interval`` seconds until cancelled"""
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except IntegrityError:
+                pass
+            except Exception:
+                logger.exception("Cache sync for %s failed", self.namespace)
+            await asyncio.sleep(interval)
@@ -0,0 +1,31 @@
+"""Outgoing email over the SMTP server in settings"""
+import asyncio
+import logging
+import smtplib
+from email.message import EmailMessage
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def send_email(to: str, subject: str, body: str) -> None:
+    """Send a plain-text email; logs and skips when SMTP isn't configured"""
+    if not settings.SMTP_USER:
+        logger.info("SMTP not configured; skipping email to %s: %s", to, subject)
+        return
+
+    message = EmailMessage()
+    message["From"] = settings.FROM_EMAIL
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(body)
+
+    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=30) as smtp:
+        smtp.starttls()
+        smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        smtp.send_message(message)
+
+
+async def send_email_async(to: str, subject: str, body: str) -> None:
+    """``send_email`` on a thread, so SMTP round trips don't block the event loop"""
+    await asyncio.to_thread(send_email, to, subject, body)
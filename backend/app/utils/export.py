@@ -0,0 +1,47 @@
+"""Line-at-a-time CSV/NDJSON serialization for streamed exports"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Dict, List
+
+FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _json_value(value):
+    if value is None or isinstance(value, (bool, int, str, list, dict)):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    # Numeric columns come back as Decimal; keep them exact
+    return str(value)
+
+
+def export_header(fmt: str, columns: List[str]) -> str:
+    """The CSV header row (NDJSON has none)"""
+    if fmt == "csv":
+        return ",".join(columns) + "\r\n"
+    return ""
+
+
+def export_line(fmt: str, columns: List[str], data: Dict[str, object]) -> str:
+    """Serialize one record, taking ``columns`` from ``data`` in order"""
+    values = {column: _json_value(data.get(column)) for column in columns}
+    if fmt == "ndjson":
+        return json.dumps(values, separators=(",", ":")) + "\n"
+
+    cells = []
+    for value in values.values():
+        if value is None:
+            cells.append("")
+        elif isinstance(value, (list, dict)):
+            cells.append(json.dumps(value))
+        elif isinstance(value, bool):
+            cells.append("true" if value else "false")
+        else:
+            cells.append(str(value))
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(cells)
+    return buffer.getvalue()
@@ -0,0 +1,94 @@
+"""Response cache with strong ETags for public, read-heavy endpoints.
+
+Entries are keyed on the request path plus its normalized query string and
+hold the serialized body, so a hit (or a matching ``If-None-Match``) is
+answered without touching the database. Invalidation bumps a generation
+number stored in the backend instead of deleting keys, which also works
+when the backend is shared between workers.
+"""
+import hashlib
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+from fastapi import Request, Response
+from app.utils.cache import CacheBackend
+from app.utils.serialization import dump_json
+
+# The generation marker should outlive every entry it guards
+_GENERATION_TTL = 10 ** 9
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, namespace: str, max_age: int = 0):
+        self.backend = backend
+        self.namespace = namespace
+        self.max_age = max_age
+
+    def _generation(self) -> int:
+        key = f"{self.namespace}:generation"
+        generation = self.backend.get(key)
+        if generation is None:
+            # A fresh (or evicted) marker must never match keys cached before it
+            generation = time.time_ns()
+            self.backend.set(key, generation, ttl=_GENERATION_TTL)
+        return generation
+
+    def _key(self, request: Request) -> str:
+        # Sort params so ?a=1&b=2 and ?b=2&a=1 share an entry
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{self.namespace}:{self._generation()}:{request.url.path}?{query}"
+
+    def _headers(self, etag: str, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={self.max_age}"}
+        if extra:
+            headers.update(extra)
+        return headers
+
+    @staticmethod
+    def _etag_matches(request: Request, etag: str) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        if header.strip() == "*":
+            return True
+        # If-None-Match uses weak comparison, so ignore any W/ prefix
+        candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+        return etag in candidates
+
+    def _respond(self, request: Request, body: bytes, etag: str, headers: Dict[str, str]) -> Response:
+        if self._etag_matches(request, etag):
+            return Response(status_code=304, headers=self._headers(etag))
+        return Response(content=body, media_type="application/json", headers=self._headers(etag, headers))
+
+    def lookup(self, request: Request) -> Tuple[Optional[Response], str]:
+        """Return the cached response (or a 304) for this request, if any, and its key.
+
+        The key is taken before the handler reads the database; storing under
+        it means a write that lands mid-request can't be masked by stale data.
+        """
+        key = self._key(request)
+        entry = self.backend.get(key)
+        if entry is None:
+            return None, key
+        body, etag, headers = entry
+        return self._respond(request, body, etag, headers), key
+
+    def store(
+        self,
+        request: Request,
+        key: str,
+        response_type: Any,
+        data: Any,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        """Serialize ``data`` as ``response_type``, cache it and build the response"""
+        body = dump_json(response_type, data)
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        headers = headers or {}
+
+        self.backend.set(key, (body, etag, headers))
+        return self._respond(request, body, etag, headers)
+
+    def invalidate(self) -> None:
+        """Make every cached response stale"""
+        self.backend.set(f"{self.namespace}:generation", time.time_ns(), ttl=_GENERATION_TTL)
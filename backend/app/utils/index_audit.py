@@ -0,0 +1,110 @@
+"""EXPLAIN-based audit of the hot queries issued by app/routes.
+
+Each entry mirrors the shape of a real route query. ``audit_indexes`` asks
+the database for its plan and reports any query that falls back to a full
+table scan (or, on SQLite, to a temporary sort for its ORDER BY).
+tests/test_indexes.py runs it against a database migrated to head.
+"""
+import re
+from typing import Dict, List
+from sqlalchemy import select, text, tuple_
+from app.models.category import CategoryClosure
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.models.user import User
+from app.utils.low_stock import low_stock_filter
+
+_SAMPLE_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def hot_queries() -> Dict[str, object]:
+    """Representative statements for the routes that run most often"""
+    active = Product.is_active == True
+    return {
+        "list_products (newest)": select(Product).filter(active)
+            .order_by(Product.created_at.desc(), Product.id.desc()).limit(20),
+        "list_products (price, next page)": select(Product).filter(
+            active, tuple_(Product.price, Product.id) > tuple_(10, _SAMPLE_ID)
+        ).order_by(Product.price, Product.id).limit(20),
+        "list_products (name)": select(Product).filter(active)
+            .order_by(Product.name, Product.id).limit(20),
+        "list_products (category)": select(Product).filter(active, Product.category_id == _SAMPLE_ID)
+            .order_by(Product.created_at.desc(), Product.id.desc()).limit(20),
+        "list_products (category subtree)": select(Product)
+            .join(CategoryClosure, CategoryClosure.descendant_id == Product.category_id)
+            .filter(active, CategoryClosure.ancestor_id == _SAMPLE_ID)
+            .order_by(Product.created_at.desc(), Product.id.desc()).limit(20),
+        "list_products (featured)": select(Product).filter(active, Product.is_featured == True)
+            .order_by(Product.created_at.desc(), Product.id.desc()).limit(20),
+        "get_product (id or slug)": select(Product).filter(
+            ((Product.id == _SAMPLE_ID) | (Product.slug == "sample")) & active
+        ),
+        "checkout cart products": select(Product).filter(Product.id.in_([_SAMPLE_ID, _SAMPLE_ID[:-1] + "1"])),
+        "low stock products (threshold)": select(Product).filter(low_stock_filter(10))
+            .order_by(Product.stock_quantity, Product.id).limit(50),
+        "low stock feed": select(Product).filter(low_stock_filter())
+            .order_by(Product.stock_quantity, Product.id).limit(50),
+        "list_orders (customer)": select(Order).filter(Order.user_id == _SAMPLE_ID)
+            .order_by(Order.created_at.desc()),
+        "create_order (idempotent retry)": select(Order).filter(
+            Order.user_id == _SAMPLE_ID, Order.idempotency_key == "pi_sample"
+        ),
+        "order items (selectinload)": select(OrderItem).filter(OrderItem.order_id.in_([_SAMPLE_ID])),
+        "order items by product": select(OrderItem).filter(OrderItem.product_id == _SAMPLE_ID),
+        "admin orders": select(Order).order_by(Order.created_at.desc(), Order.id.desc()).limit(20),
+        "admin orders (status)": select(Order).filter(Order.status == "paid")
+            .order_by(Order.created_at.desc(), Order.id.desc()).limit(20),
+        "admin users": select(User).order_by(User.created_at.desc(), User.id.desc()).limit(20),
+    }
+
+
+# Unfiltered listings where walking an index in order (and stopping at the
+# LIMIT) is the intended plan
+ORDERED_INDEX_WALKS = {"admin orders", "admin users"}
+
+
+# SQLite: a bare "SCAN products" (no "USING ... INDEX") is a full table scan
+_SQLITE_TABLE_SCAN = re.compile(r"^SCAN (TABLE )?\w+( AS \w+)?$")
+# "SCAN orders USING INDEX ..." reads the whole index; fine only for ordered walks
+_SQLITE_INDEX_SCAN = re.compile(r"^SCAN (TABLE )?\w+( AS \w+)? USING (COVERING )?INDEX")
+
+
+def _explain(conn, statement) -> List[str]:
+    # Sample values are plain literals, so inline them rather than bind
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()]
+    return [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {sql}").all()]
+
+
+def _problems(dialect: str, plan: List[str], index_walk_ok: bool) -> List[str]:
+    problems = []
+    for line in plan:
+        detail = line.strip()
+        if dialect == "sqlite":
+            if _SQLITE_TABLE_SCAN.match(detail):
+                problems.append(detail)
+            elif _SQLITE_INDEX_SCAN.match(detail) and not index_walk_ok:
+                problems.append(detail)
+            elif detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+                problems.append(detail)
+        elif "Seq Scan" in detail:
+            problems.append(detail)
+    return problems
+
+
+def audit_indexes(bind) -> Dict[str, List[str]]:
+    """EXPLAIN every hot query; returns ``{query name: offending plan lines}``"""
+    failures = {}
+    with bind.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            # Small dev tables make seq scans look cheap; ask whether an index *can* serve
+            conn.execute(text("SET enable_seqscan = off"))
+
+        for name, statement in hot_queries().items():
+            problems = _problems(conn.dialect.name, _explain(conn, statement), name in ORDERED_INDEX_WALKS)
+            if problems:
+                failures[name] = problems
+
+        conn.rollback()
+    return failures
@@ -0,0 +1,285 @@
+"""Background jobs for side effects that shouldn't hold up a request.
+
+Request handlers call ``enqueue(db, name, **payload)`` inside their
+transaction. The job only becomes runnable once that transaction commits
+(and is dropped if it rolls back), so an email is never sent for an order
+that didn't happen. Workers (``run_worker``, in-process or via
+``python worker.py``) run the registered handler and retry failures with
+exponential backoff.
+
+``JobBackend`` is the storage interface. ``DatabaseJobBackend`` (the
+default) writes an outbox row in the same transaction, so jobs survive
+restarts and are shared by every process; ``MemoryJobBackend`` keeps them
+in this process only.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import and_, delete, event, or_, select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+handlers: Dict[str, Callable[..., Awaitable[None]]] = {}
+
+
+def task(name: str):
+    """Register an async function as the handler for jobs called ``name``"""
+    def register(func):
+        handlers[name] = func
+        return func
+    return register
+
+
+class QueuedJob:
+    def __init__(self, name: str, payload: dict, id: Optional[str] = None, attempts: int = 0,
+                 max_attempts: Optional[int] = None, run_at: Optional[datetime] = None):
+        self.id = id or str(uuid.uuid4())
+        self.name = name
+        self.payload = payload
+        self.attempts = attempts
+        self.max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+        self.run_at = run_at or datetime.utcnow()
+
+
+class JobBackend:
+    """Interface for job storage"""
+
+    def stage(self, session: Session, job: QueuedJob) -> None:
+        """Record ``job`` as part of the session's open transaction"""
+        raise NotImplementedError
+
+    def publish(self, jobs: List[QueuedJob]) -> None:
+        """Called once the staging transaction has committed"""
+
+    async def claim(self, limit: int) -> List[QueuedJob]:
+        """Take up to ``limit`` due jobs, counting an attempt on each"""
+        raise NotImplementedError
+
+    async def complete(self, job: QueuedJob) -> None:
+        raise NotImplementedError
+
+    async def retry(self, job: QueuedJob, error: str, run_at: datetime) -> None:
+        raise NotImplementedError
+
+    async def fail(self, job: QueuedJob, error: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryJobBackend(JobBackend):
+    """Jobs held in this process; lost on restart and invisible to other workers"""
+
+    def __init__(self):
+        self._heap: list = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self.failed: List[QueuedJob] = []
+
+    def _push(self, job: QueuedJob) -> None:
+        with self._lock:
+            heapq.heappush(self._heap, (job.run_at, next(self._order), job))
+
+    def stage(self, session: Session, job: QueuedJob) -> None:
+        pass  # Nothing to write; publish() pushes it after commit
+
+    def publish(self, jobs: List[QueuedJob]) -> None:
+        for job in jobs:
+            self._push(job)
+
+    async def claim(self, limit: int) -> List[QueuedJob]:
+        now = datetime.utcnow()
+        claimed = []
+        with self._lock:
+            while self._heap and len(claimed) < limit and self._heap[0][0] <= now:
+                job = heapq.heappop(self._heap)[2]
+                job.attempts += 1
+                claimed.append(job)
+        return claimed
+
+    async def complete(self, job: QueuedJob) -> None:
+        pass
+
+    async def retry(self, job: QueuedJob, error: str, run_at: datetime) -> None:
+        job.run_at = run_at
+        self._push(job)
+
+    async def fail(self, job: QueuedJob, error: str) -> None:
+        self.failed.append(job)
+
+
+class DatabaseJobBackend(JobBackend):
+    """Transactional outbox in the ``jobs`` table"""
+
+    def __init__(self, lock_timeout: float = 300):
+        self.lock_timeout = lock_timeout
+
+    def stage(self, session: Session, job: QueuedJob) -> None:
+        session.add(Job(
+            id=job.id,
+            name=job.name,
+            payload=job.payload,
+            status=JobStatus.PENDING.value,
+            max_attempts=job.max_attempts,
+            run_at=job.run_at
+        ))
+
+    def _due(self, now: datetime):
+        # Pending jobs whose time has come, plus running ones whose worker died
+        return or_(
+            and_(Job.status == JobStatus.PENDING.value, Job.run_at <= now),
+            and_(Job.status == JobStatus.RUNNING.value,
+                 Job.locked_at < now - timedelta(seconds=self.lock_timeout)),
+        )
+
+    async def claim(self, limit: int) -> List[QueuedJob]:
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            query = select(Job.id).where(self._due(now)).order_by(Job.run_at).limit(limit)
+            if db.bind.dialect.name == "postgresql":
+                # Concurrent workers pick different rows instead of queueing on the same ones
+                query = query.with_for_update(skip_locked=True)
+            candidates = (await db.execute(query)).scalars().all()
+
+            claimed = []
+            for job_id in candidates:
+                # Conditional update: only one worker can move a due job to running
+                result = await db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, self._due(now))
+                    .values(status=JobStatus.RUNNING.value, locked_at=now, attempts=Job.attempts + 1)
+                    .returning(Job.id, Job.name, Job.payload, Job.attempts, Job.max_attempts)
+                    .execution_options(synchronize_session=False)
+                )
+                row = result.first()
+                if row is not None:
+                    claimed.append(QueuedJob(
+                        row.name, row.payload, id=row.id, attempts=row.attempts, max_attempts=row.max_attempts
+                    ))
+            await db.commit()
+        return claimed
+
+    async def _update(self, job: QueuedJob, **values) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Job).where(Job.id == job.id).values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    async def complete(self, job: QueuedJob) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Job).where(Job.id == job.id))
+            await db.commit()
+
+    async def retry(self, job: QueuedJob, error: str, run_at: datetime) -> None:
+        await self._update(job, status=JobStatus.PENDING.value, run_at=run_at, locked_at=None, last_error=error)
+
+    async def fail(self, job: QueuedJob, error: str) -> None:
+        await self._update(job, status=JobStatus.FAILED.value, locked_at=None, last_error=error)
+
+
+def _default_backend() -> JobBackend:
+    if settings.JOB_BACKEND == "memory":
+        return MemoryJobBackend()
+    return DatabaseJobBackend(lock_timeout=settings.JOB_LOCK_TIMEOUT_SECONDS)
+
+
+job_backend: JobBackend = _default_backend()
+
+# Set by a running worker so commits can wake it instead of waiting for the next poll
+_wakeup: Optional[asyncio.Event] = None
+_wakeup_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def set_job_backend(backend: JobBackend) -> None:
+    """Swap the backend used to store jobs"""
+    global job_backend
+    job_backend = backend
+
+
+def enqueue(db, name: str, **payload) -> None:
+    """Schedule ``name`` to run with ``payload`` once ``db``'s transaction commits"""
+    if name not in handlers:
+        raise LookupError(f"No handler registered for job '{name}'")
+    session = getattr(db, "sync_session", db)
+    job = QueuedJob(name, payload)
+    job_backend.stage(session, job)
+    session.info.setdefault("staged_jobs", []).append(job)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_jobs(session):
+    jobs = session.info.pop("staged_jobs", None)
+    if not jobs:
+        return
+    job_backend.publish(jobs)
+    if _wakeup is not None and _wakeup_loop is not None:
+        _wakeup_loop.call_soon_threadsafe(_wakeup.set)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_staged_jobs(session):
+    session.info.pop("staged_jobs", None)
+
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter: ~base, 2x base, 4x base ... capped"""
+    delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempt - 1), settings.JOB_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def run_job(job: QueuedJob) -> None:
+    """Run one claimed job and record the outcome"""
+    try:
+        handler = handlers.get(job.name)
+        if handler is None:
+            raise LookupError(f"No handler registered for job '{job.name}'")
+        await handler(**job.payload)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        if job.attempts >= job.max_attempts:
+            logger.error("Job %s (%s) failed after %d attempt(s): %s", job.id, job.name, job.attempts, error)
+            await job_backend.fail(job, error)
+        else:
+            delay = retry_delay(job.attempts)
+            logger.warning("Job %s (%s) failed, retrying in %.0fs: %s", job.id, job.name, delay, error)
+            await job_backend.retry(job, error, datetime.utcnow() + timedelta(seconds=delay))
+    else:
+        await job_backend.complete(job)
+
+
+async def run_worker(stop: Optional[asyncio.Event] = None) -> None:
+    """Claim and run due jobs until ``stop`` is set (or the task is cancelled)"""
+    global _wakeup, _wakeup_loop
+    _wakeup, _wakeup_loop = asyncio.Event(), asyncio.get_running_loop()
+
+    stop = stop or asyncio.Event()
+
+    while not stop.is_set():
+        # Cleared before claiming so a commit that lands meanwhile isn't missed
+        _wakeup.clear()
+        try:
+            jobs = await job_backend.claim(settings.JOB_BATCH_SIZE)
+        except Exception:
+            logger.exception("Claiming jobs failed")
+            jobs = []
+
+        if jobs:
+            await asyncio.gather(*(run_job(job) for job in jobs))
+            continue
+
+        waiters = [asyncio.ensure_future(_wakeup.wait()), asyncio.ensure_future(stop.wait())]
+        try:
+            await asyncio.wait(waiters, timeout=settings.JOB_POLL_INTERVAL_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
@@ -0,0 +1,205 @@
+"""Low-stock feed: the indexed listing query and threshold-crossing events.
+
+A product is low on stock while it is active and ``0 < stock_quantity <
+reorder_threshold``. The listing filters on exactly that predicate, which
+the partial index ``ix_products_low_stock`` covers, so a poll reads only
+the products that are actually low instead of the whole catalog.
+
+Routes that change stock call ``record_stock_change`` inside their
+transaction. When a product moves to another stock state a row is added to
+``stock_events`` in that same transaction, so it commits (or rolls back)
+with the change. Every worker runs a ``StockEventRelay`` that polls the
+table for new rows and hands them to ``stock_events``, the broadcaster its
+own admin SSE streams subscribe to. A stream therefore sees changes made by
+any worker or instance, within ``LOW_STOCK_STREAM_POLL_SECONDS``.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Set, Tuple
+from sqlalchemy import and_, delete, func, literal_column, select, true
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.product import Product
+from app.models.stock_event import StockEvent
+from app.utils.jobs import enqueue
+
+logger = logging.getLogger(__name__)
+
+IN_STOCK = "in_stock"
+LOW_STOCK = "low_stock"
+OUT_OF_STOCK = "out_of_stock"
+INACTIVE = "inactive"
+
+# How bad each state is; an alert goes out when a product gets worse
+_SEVERITY = {INACTIVE: 0, IN_STOCK: 0, LOW_STOCK: 1, OUT_OF_STOCK: 2}
+
+
+def low_stock_filter(threshold: Optional[int] = None):
+    """WHERE clause for low-stock products.
+
+    Without ``threshold`` each product's own ``reorder_threshold`` applies
+    and the clause is the partial index predicate. Constants are inlined
+    rather than bound so SQLite's planner can match it to the index.
+    """
+    limit = Product.reorder_threshold if threshold is None else literal_column(str(int(threshold)))
+    return and_(
+        Product.is_active == true(),
+        Product.stock_quantity > literal_column("0"),
+        Product.stock_quantity < limit,
+    )
+
+
+def stock_state(stock: Optional[int], threshold: int, is_active: bool = True) -> str:
+    if not is_active:
+        return INACTIVE
+    if (stock or 0) <= 0:
+        return OUT_OF_STOCK
+    if stock < threshold:
+        return LOW_STOCK
+    return IN_STOCK
+
+
+class StockEventBroadcaster:
+    """Fan stock events out to every subscriber in this process"""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue]:
+        """Queue receiving events published while the block is open"""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, events: List[dict]) -> None:
+        for stock_event in events:
+            if queue.full():
+                # A stalled client loses its oldest events rather than growing without bound
+                queue.get_nowait()
+            queue.put_nowait(stock_event)
+
+    def publish(self, events: List[dict]) -> None:
+        """Hand committed ``events`` to every subscriber"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            # Subscribers may live on another thread's event loop
+            loop.call_soon_threadsafe(self._deliver, queue, events)
+
+
+stock_events = StockEventBroadcaster()
+
+
+def _as_event(row: StockEvent) -> dict:
+    return {
+        "event": row.event,
+        "previous": row.previous,
+        "product_id": row.product_id,
+        "name": row.name,
+        "stock_quantity": row.stock_quantity,
+        "reorder_threshold": row.reorder_threshold,
+    }
+
+
+class StockEventRelay:
+    """Publish stock_events rows committed by any worker to this worker's subscribers"""
+
+    # Ids are taken at insert but become visible at commit, so a row can appear
+    # below the newest id already relayed; each poll re-reads this many ids back
+    LOOKBACK = 100
+    # Expired rows are deleted at most this often (seconds)
+    PRUNE_INTERVAL = 60
+
+    def __init__(self, broadcaster: StockEventBroadcaster):
+        self.broadcaster = broadcaster
+        self._last_id: Optional[int] = None
+        self._relayed: Set[int] = set()
+        self._pruned_at = 0.0
+
+    async def poll(self, db) -> int:
+        """Relay rows committed since the last poll; returns how many"""
+        if self._last_id is None:
+            # Start from now: streams only carry changes made after they connect
+            self._last_id = await db.scalar(select(func.max(StockEvent.id))) or 0
+            self._relayed = set((await db.execute(
+                select(StockEvent.id).where(StockEvent.id > self._last_id - self.LOOKBACK)
+            )).scalars())
+            return 0
+
+        rows = (await db.execute(
+            select(StockEvent).where(StockEvent.id > self._last_id - self.LOOKBACK).order_by(StockEvent.id)
+        )).scalars().all()
+        fresh = [row for row in rows if row.id > self._last_id or row.id not in self._relayed]
+        if fresh:
+            self.broadcaster.publish([_as_event(row) for row in fresh])
+            self._last_id = max(self._last_id, fresh[-1].id)
+            self._relayed.update(row.id for row in fresh)
+            self._relayed = {row_id for row_id in self._relayed if row_id > self._last_id - self.LOOKBACK}
+        return len(fresh)
+
+    async def prune(self, db) -> None:
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.LOW_STOCK_EVENT_RETENTION_SECONDS)
+        await db.execute(delete(StockEvent).where(StockEvent.created_at < cutoff))
+        await db.commit()
+
+    async def run(self, interval: float) -> None:
+        """Poll every ``interval`` seconds until cancelled"""
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.poll(db)
+                    if time.monotonic() - self._pruned_at >= self.PRUNE_INTERVAL:
+                        self._pruned_at = time.monotonic()
+                        await self.prune(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Stock event relay failed")
+            await asyncio.sleep(interval)
+
+
+stock_event_relay = StockEventRelay(stock_events)
+
+
+def record_stock_change(
+    db,
+    product_id: str,
+    name: str,
+    old_state: str,
+    stock: int,
+    threshold: int,
+    is_active: bool = True
+) -> None:
+    """Record an event (and an alert, if it got worse) when a product changed stock state"""
+    new_state = stock_state(stock, threshold, is_active)
+    if new_state == old_state:
+        return
+
+    db.add(StockEvent(
+        event=new_state,
+        previous=old_state,
+        product_id=str(product_id),
+        name=name,
+        stock_quantity=stock,
+        reorder_threshold=threshold,
+    ))
+    if _SEVERITY[new_state] > _SEVERITY[old_state]:
+        enqueue(db, "low_stock_alert", product_id=str(product_id))
+
+
+def format_sse(stock_event: dict) -> str:
+    return f"event: {stock_event['event']}\ndata: {json.dumps(stock_event, separators=(',', ':'))}\n\n"
@@ -0,0 +1,148 @@
+"""Prometheus metrics, served in text exposition format at /metrics.
+
+- ``http_request_duration_seconds{method,route,status}``: latency histogram
+  keyed by route template (``/api/v1/orders/{order_id}``), not raw path
+- ``http_requests_in_progress{method}``
+- ``db_pool_*{engine}``: checkouts, connections checked out, overflow in
+  use, configured size and the time spent waiting for a connection
+- ``orders_created_total`` and ``checkout_failures_total{stage,reason}``
+
+With several worker processes, point ``PROMETHEUS_MULTIPROC_DIR`` at an
+empty directory before starting them. Each worker then writes its samples
+there and whichever worker answers a scrape sums all of them, so counters
+and histograms cover every worker and gauges add up the live ones.
+"""
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+if MULTIPROCESS:
+    # Metrics below open their sample files there as soon as they are defined,
+    # in every process that imports the app (workers, alembic, worker.py)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1, 2.5, 5, 10)
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ["method"], multiprocess_mode="livesum"
+)
+
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts", "Connections checked out of the pool", ["engine"])
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Overflow connections open beyond pool_size", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool_size", ["engine"], multiprocess_mode="livesum")
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time to get a connection from the pool (including connecting)", ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+ORDERS_CREATED = Counter("orders_created", "Orders placed")
+CHECKOUT_FAILURES = Counter(
+    "checkout_failures", "Checkout requests refused or failed", ["stage", "reason"]
+)
+
+# Requests that matched no route share one label, so scanners can't grow the series count
+_UNMATCHED_ROUTE = "unmatched"
+
+
+def render_metrics() -> bytes:
+    """Current metrics in text exposition format, summed over all workers in multiprocess mode"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def record_checkout_failure(stage: str, reason: str) -> None:
+    CHECKOUT_FAILURES.labels(stage, reason).inc()
+
+
+def _timed_pool_class(base, engine_name: str):
+    """``base`` with ``connect()`` timed into ``db_pool_wait_seconds``"""
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return base.connect(self)
+        finally:
+            DB_POOL_WAIT.labels(engine_name).observe(time.perf_counter() - started)
+
+    return type(f"Timed{base.__name__}", (base,), {"connect": connect})
+
+
+def record_pool_size(engine, engine_name: str) -> None:
+    """Publish the configured pool_size; again after fork, as multiprocess values start over per pid"""
+    size = getattr(getattr(engine, "sync_engine", engine).pool, "size", None)
+    DB_POOL_SIZE.labels(engine_name).set(size() if size else 0)
+
+
+def instrument_pool(engine, engine_name: str) -> None:
+    """Track checkouts, overflow and wait time for ``engine``'s (sync or async) pool"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    pool = sync_engine.pool
+    # Swapping the class rather than the instance survives dispose(): the
+    # replacement pool is built from self.__class__ and keeps these events
+    pool.__class__ = _timed_pool_class(type(pool), engine_name)
+
+    record_pool_size(engine, engine_name)
+    checked_out = DB_POOL_CHECKED_OUT.labels(engine_name)
+    overflow = DB_POOL_OVERFLOW.labels(engine_name)
+
+    def update_overflow():
+        current = getattr(sync_engine.pool, "overflow", None)
+        if current:
+            overflow.set(max(current(), 0))
+
+    @event.listens_for(sync_engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.labels(engine_name).inc()
+        checked_out.inc()
+        update_overflow()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+        update_overflow()
+
+
+class MetricsMiddleware:
+    """Observe latency per route template and status, and count requests in flight"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500  # If the app raises before responding
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # FastAPI records the matched route in the scope during routing
+            route = getattr(scope.get("route"), "path", None) or _UNMATCHED_ROUTE
+            REQUEST_LATENCY.labels(method, route, str(status)).observe(time.perf_counter() - started)
+
@@ -0,0 +1,79 @@
+"""Background job handlers for order and stock notifications.
+
+Enqueued with ``enqueue(db, "<name>", ...)`` from the routes; see
+app/utils/jobs.py. Handlers load what they need by id, so a retry always
+sees the current data.
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.order import Order
+from app.models.product import Product
+from app.models.user import User
+from app.utils.email import send_email_async
+from app.utils.jobs import task
+
+
+async def _order_with_customer(order_id: str):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Order, User.email, User.full_name)
+            .join(User, Order.user_id == User.id)
+            .options(selectinload(Order.items))
+            .filter(Order.id == order_id)
+        )
+        return result.first()
+
+
+@task("order_confirmation")
+async def order_confirmation(order_id: str) -> None:
+    row = await _order_with_customer(order_id)
+    if row is None:
+        return
+    order, email, name = row
+
+    lines = [f"  {item.quantity} x {item.product_name} @ {item.price}" for item in order.items]
+    body = "\n".join([
+        f"Hi {name},",
+        "",
+        f"Thank you for your order {order.order_number}.",
+        "",
+        *lines,
+        "",
+        f"Subtotal: {order.subtotal}",
+        f"Shipping: {order.shipping_cost}",
+        f"Tax: {order.tax_amount}",
+        f"Total: {order.total_amount}",
+    ])
+    await send_email_async(email, f"Order confirmation {order.order_number}", body)
+
+
+@task("shipping_notification")
+async def shipping_notification(order_id: str) -> None:
+    row = await _order_with_customer(order_id)
+    if row is None:
+        return
+    order, email, name = row
+
+    body = f"Hi {name},\n\nYour order {order.order_number} is on its way."
+    if order.tracking_number:
+        body += f"\nTracking number: {order.tracking_number}"
+    await send_email_async(email, f"Your order {order.order_number} has shipped", body)
+
+
+@task("low_stock_alert")
+async def low_stock_alert(product_id: str) -> None:
+    if not settings.ADMIN_ALERT_EMAIL:
+        return
+
+    async with AsyncSessionLocal() as db:
+        product = await db.get(Product, product_id)
+    if product is None:
+        return
+
+    await send_email_async(
+        settings.ADMIN_ALERT_EMAIL,
+        f"Low stock: {product.name}",
+        f"{product.name} ({product.slug}) is down to {product.stock_quantity} unit(s)."
+    )
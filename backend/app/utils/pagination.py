@@ -0,0 +1,108 @@
+"""Keyset (cursor) pagination helpers.
+
+A cursor records the sort column value and id of the last row on a page.
+The next page is fetched with ``(sort_col, id) < (value, id)`` (or ``>`` when
+ascending), which a composite ``(sort_col, id)`` index serves directly no
+matter how deep the page is, and which is stable while rows are inserted.
+"""
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, Tuple, List
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_, DateTime, Numeric
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _load_value(value, column):
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Numeric):
+        return Decimal(value)
+    return value
+
+
+def encode_cursor(sort_column, id_column, row, descending: bool) -> str:
+    """Build an opaque cursor pointing just after ``row``"""
+    payload = {
+        "c": sort_column.key,
+        "d": "desc" if descending else "asc",
+        "v": _dump_value(getattr(row, sort_column.key)),
+        "id": str(getattr(row, id_column.key)),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column, descending: bool) -> Tuple[object, str]:
+    """Return ``(sort_value, last_id)`` from a cursor made for the same ordering"""
+    invalid = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload["c"] != sort_column.key or payload["d"] != ("desc" if descending else "asc"):
+            raise invalid
+        return _load_value(payload["v"], sort_column), payload["id"]
+    except HTTPException:
+        raise
+    except (ValueError, KeyError, TypeError):
+        raise invalid
+
+
+async def paginate(
+    db,
+    query,
+    sort_column,
+    id_column,
+    limit: int,
+    descending: bool = True,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    scalars: bool = True
+) -> Tuple[List, Optional[str]]:
+    """Order the ``query`` select by ``(sort_column, id_column)`` and fetch one page.
+
+    With a ``cursor`` the page starts after the encoded row and ``skip`` is
+    ignored; otherwise ``skip`` is applied as a plain offset so existing
+    clients keep working. Returns the rows and the cursor for the next page
+    (``None`` on the last page). Pass ``scalars=False`` for a column
+    projection; its rows must include ``sort_column`` and ``id_column``.
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_column, descending)
+        key = tuple_(sort_column, id_column)
+        if descending:
+            query = query.filter(key < tuple_(value, last_id))
+        else:
+            query = query.filter(key > tuple_(value, last_id))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    if not cursor and skip:
+        query = query.offset(skip)
+
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.scalars().all() if scalars else result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort_column, id_column, rows[-1], descending)
+
+    return rows, next_cursor
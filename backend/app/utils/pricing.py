@@ -0,0 +1,87 @@
+"""Checkout pricing rules.
+
+The single place that turns a cart into money: unit prices, shipping and
+tax. Both the payment intent and the order are priced here, so the amount
+quoted to the customer and the amount recorded on the order can't drift.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+from pydantic import BaseModel
+from app.config import settings
+
+CENT = Decimal("0.01")
+
+
+class CheckoutError(HTTPException):
+    """A refused checkout; ``reason`` labels it in the checkout_failures metric"""
+
+    def __init__(self, status_code: int, detail: str, reason: str):
+        super().__init__(status_code=status_code, detail=detail)
+        self.reason = reason
+
+
+def to_cents(amount) -> Decimal:
+    return Decimal(str(amount)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class PricedLine(BaseModel):
+    product_id: str
+    product_name: str
+    product_image: Optional[str] = None
+    quantity: int
+    unit_price: Decimal
+    stock_quantity: int  # Stock seen when the line was priced
+
+
+class PricedCart(BaseModel):
+    lines: List[PricedLine]
+    subtotal: Decimal
+    shipping: Decimal
+    tax: Decimal
+    total: Decimal
+
+    def quantities(self) -> Dict[str, int]:
+        """Total quantity per product, merging repeated lines"""
+        quantities: Dict[str, int] = {}
+        for line in self.lines:
+            quantities[line.product_id] = quantities.get(line.product_id, 0) + line.quantity
+        return quantities
+
+    def product_name(self, product_id: str) -> str:
+        return next(line.product_name for line in self.lines if line.product_id == product_id)
+
+
+def unit_price(product) -> Decimal:
+    """What one unit sells for: the discount price when there is one"""
+    return to_cents(product.discount_price or product.price)
+
+
+def shipping_for(subtotal: Decimal) -> Decimal:
+    if subtotal >= settings.FREE_SHIPPING_THRESHOLD:
+        return Decimal("0.00")
+    return to_cents(settings.SHIPPING_FLAT_RATE)
+
+
+def tax_for(subtotal: Decimal) -> Decimal:
+    return to_cents(subtotal * settings.TAX_RATE)
+
+
+def price_cart(items, products) -> PricedCart:
+    """Price cart ``items`` (product_id, quantity) against loaded ``products`` keyed by id"""
+    lines = []
+    for item in items:
+        product = products[str(item.product_id)]
+        lines.append(PricedLine(
+            product_id=str(product.id),
+            product_name=product.name,
+            product_image=product.images[0] if product.images else None,
+            quantity=item.quantity,
+            unit_price=unit_price(product),
+            stock_quantity=product.stock_quantity
+        ))
+
+    subtotal = sum((line.unit_price * line.quantity for line in lines), Decimal("0.00"))
+    shipping = shipping_for(subtotal)
+    tax = tax_for(subtotal)
+    return PricedCart(lines=lines, subtotal=subtotal, shipping=shipping, tax=tax, total=subtotal + shipping + tax)
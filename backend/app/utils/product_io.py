@@ -0,0 +1,222 @@
+"""Bulk product import/export in CSV or NDJSON.
+
+Import is split so the same pipeline serves the admin endpoint (async) and
+``bulk_products.py`` (sync): ``ProductImporter.chunks`` parses and validates
+rows into batches, and the caller writes each batch with ``write_chunk`` and
+commits. Rows are matched on ``slug``: new slugs are inserted, known ones
+updated. An update only touches the columns the row supplied, so a feed that
+carries prices alone leaves stock, images and flags as they are.
+
+On PostgreSQL and SQLite a batch is one upsert per set of supplied columns
+(a single executemany each); other databases get an UPDATE per row, then an
+INSERT in a savepoint if the slug is new.
+"""
+import csv
+import json
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, TextIO, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.category import Category
+from app.models.product import Product
+from app.schemas.product import ProductImportRow, ProductImportError
+
+# Column order for CSV export; the importer accepts the same layout
+EXPORT_COLUMNS = [
+    "slug", "name", "brand", "category_slug", "price", "discount_price", "stock_quantity",
+    "reorder_threshold", "is_featured", "is_active", "images", "description", "additional_info",
+]
+
+_table = Product.__table__
+
+# Columns an import may overwrite on an existing product
+_UPDATE_COLUMNS = [
+    "name", "description", "brand", "category_id", "price", "discount_price", "stock_quantity",
+    "reorder_threshold", "images", "is_featured", "is_active", "additional_info", "updated_at",
+]
+
+
+def category_lookup_query():
+    """All category slugs and ids; the catalog has few enough to load at once"""
+    return select(Category.slug, Category.id)
+
+
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# A validated row: the columns it may overwrite, and its full insert parameters
+PreparedRow = Tuple[FrozenSet[str], dict]
+
+
+@lru_cache(maxsize=None)
+def upsert_statement(dialect: str, columns: FrozenSet[str]):
+    """INSERT products or, when the slug exists, update ``columns`` from the new row"""
+    statement = _DIALECT_INSERTS[dialect](_table)
+    return statement.on_conflict_do_update(
+        index_elements=[_table.c.slug],
+        set_={name: statement.excluded[name] for name in _UPDATE_COLUMNS if name in columns},
+    )
+
+
+def _write_row(db, columns: FrozenSet[str], values: dict) -> None:
+    changes = update(_table).where(_table.c.slug == values["slug"]).values(
+        {name: values[name] for name in _UPDATE_COLUMNS if name in columns}
+    )
+    if db.execute(changes).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(_table).values(values))
+    except IntegrityError:
+        # Another import inserted the slug first
+        db.execute(changes)
+
+
+def write_chunk(db, chunk: List[PreparedRow]) -> None:
+    """Upsert one ``ProductImporter.chunks`` batch (sync session); the caller commits"""
+    dialect = db.bind.dialect.name
+    if dialect not in _DIALECT_INSERTS:
+        for columns, values in chunk:
+            _write_row(db, columns, values)
+        return
+
+    groups: Dict[FrozenSet[str], List[dict]] = {}
+    for columns, values in chunk:
+        groups.setdefault(columns, []).append(values)
+    for columns, rows in groups.items():
+        db.execute(upsert_statement(dialect, columns), rows)
+
+
+def _csv_value(key: str, value: str):
+    if key == "images" and not value.startswith("["):
+        return [url.strip() for url in value.split("|") if url.strip()]
+    if key in ("images", "additional_info"):
+        return json.loads(value)
+    return value
+
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield ``(line number, row dict)``; a row that can't be parsed is yielded as a string error"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for raw in reader:
+            row = {}
+            try:
+                for key, value in raw.items():
+                    # Blank cells fall back to the schema defaults
+                    if key and value not in (None, ""):
+                        row[key.strip()] = _csv_value(key.strip(), value.strip())
+            except ValueError as exc:
+                yield reader.line_num, f"Invalid JSON cell: {exc}"
+                continue
+            yield reader.line_num, row
+    elif fmt == "ndjson":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_number, f"Invalid JSON: {exc}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, "Each line must be a JSON object"
+                continue
+            yield line_number, row
+    else:
+        raise ValueError(f"Unsupported format '{fmt}'")
+
+
+class ProductImporter:
+    """Validate import rows in chunks and keep a running report"""
+
+    def __init__(self, categories: Dict[str, str], chunk_size: int = 1000, max_errors: int = 1000):
+        self.categories = categories
+        self.category_ids = set(categories.values())
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.processed = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[ProductImportError] = []
+
+    def _fail(self, line: int, slug: Optional[str], messages: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(ProductImportError(line=line, slug=slug, errors=messages))
+
+    def _prepare(self, line: int, row, now: datetime) -> Optional[PreparedRow]:
+        if isinstance(row, str):
+            self._fail(line, None, [row])
+            return None
+
+        slug = row.get("slug")
+        category_slug = row.pop("category_slug", None)
+        if category_slug is not None and "category_id" not in row:
+            if category_slug not in self.categories:
+                self._fail(line, slug, [f"category_slug: unknown category '{category_slug}'"])
+                return None
+            row["category_id"] = self.categories[category_slug]
+
+        try:
+            product = ProductImportRow.model_validate(row)
+        except ValidationError as exc:
+            messages = [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()]
+            self._fail(line, slug, messages)
+            return None
+
+        category_id = str(product.category_id)
+        if category_id not in self.category_ids:
+            self._fail(line, product.slug, [f"category_id: unknown category '{category_id}'"])
+            return None
+
+        # Schema defaults fill in a new product; an existing one keeps what the row leaves out
+        columns = frozenset(product.model_fields_set | {"updated_at"})
+        values = product.model_dump()
+        values.update(id=str(uuid.uuid4()), category_id=category_id, created_at=now, updated_at=now)
+        return columns, values
+
+    def chunks(self, rows: Iterable[Tuple[int, object]]) -> Iterator[List[PreparedRow]]:
+        """Yield batches for ``write_chunk``, at most ``chunk_size`` valid rows each"""
+        batch: List[PreparedRow] = []
+        now = datetime.utcnow()
+        for line, row in rows:
+            self.processed += 1
+            values = self._prepare(line, row, now)
+            if values is None:
+                continue
+            batch.append(values)
+            if len(batch) >= self.chunk_size:
+                self.imported += len(batch)
+                yield batch
+                batch = []
+                now = datetime.utcnow()
+        if batch:
+            self.imported += len(batch)
+            yield batch
+
+    def report(self) -> dict:
+        return {
+            "processed": self.processed,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def export_query():
+    """Every product with its category slug, as plain rows (no ORM objects)"""
+    return (
+        select(
+            Product.slug, Product.name, Product.brand, Category.slug.label("category_slug"),
+            Product.price, Product.discount_price, Product.stock_quantity,
+            Product.reorder_threshold, Product.is_featured,
+            Product.is_active, Product.images, Product.description, Product.additional_info,
+        )
+        .outerjoin(Category, Product.category_id == Category.id)
+        .order_by(Product.slug)
+    )
@@ -0,0 +1,52 @@
+"""Column projections and sparse fieldsets for listing endpoints.
+
+Listings select only the columns their response model declares and get
+plain ``Row`` tuples back, so the database never ships (and SQLAlchemy
+never hydrates or identity-maps) columns the response would throw away.
+A ``fields=name,price`` query parameter trims the projection further; the
+response is then validated against a model holding just those fields.
+"""
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ConfigDict, create_model
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel], always: Tuple[str, ...] = ("id",)) -> Tuple[str, ...]:
+    """Field names requested by a ``fields=`` parameter, in model order.
+
+    Returns every field of ``model`` when ``fields`` is empty. Names in
+    ``always`` are kept regardless; unknown names are a 400.
+    """
+    if not fields:
+        return tuple(model.model_fields)
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field(s): {', '.join(sorted(unknown))}"
+        )
+    requested.update(always)
+    return tuple(name for name in model.model_fields if name in requested)
+
+
+def columns(entity, names: Tuple[str, ...], *extra) -> List:
+    """Mapped columns of ``entity`` for ``names``, plus any ``extra`` columns not already included"""
+    selected = [getattr(entity, name) for name in names]
+    selected.extend(column for column in extra if column.key not in names)
+    return selected
+
+
+@lru_cache(maxsize=256)
+def partial_model(model: Type[BaseModel], names: Tuple[str, ...]) -> Type[BaseModel]:
+    """``model`` cut down to ``names`` (or ``model`` itself when nothing is dropped)"""
+    if names == tuple(model.model_fields):
+        return model
+    return create_model(
+        model.__name__ + "Fields",
+        __config__=ConfigDict(from_attributes=True),
+        # rebuild_annotation keeps Annotated metadata such as the Money serializer
+        **{name: (model.model_fields[name].rebuild_annotation(), ...) for name in names}
+    )
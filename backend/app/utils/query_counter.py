@@ -0,0 +1,35 @@
+"""Count the SQL statements an engine executes inside a block.
+
+Used to guard routes against N+1 regressions::
+
+    with count_queries(async_engine) as counter:
+        client.get("/api/v1/orders/")
+    assert counter.count <= 3, counter.statements
+"""
+from contextlib import contextmanager
+from typing import List
+from sqlalchemy import event
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine):
+    """Yield a QueryCounter that records every statement run on ``engine`` (sync or async)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    counter = QueryCounter()
+    event.listen(sync_engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", counter)
@@ -0,0 +1,177 @@
+"""Stock reservations: short-lived holds taken at payment-intent time.
+
+``Product.reserved_quantity`` is a counter of units held by live checkouts,
+so availability is ``stock_quantity - reserved_quantity`` on the product row
+itself. Every change is a single conditional ``UPDATE`` (no read-then-write,
+no SELECT ... FOR UPDATE), so concurrent shoppers only contend for the
+instant of that statement and the last units can't be promised twice.
+
+A ``StockHold`` row records each reservation. Holds are claimed by deleting
+the row: ``take_stock`` turns them into a sale, ``release_expired_holds``
+hands expired ones back. Only the claimer adjusts the counter, so a hold is
+never released twice. A shopper has one checkout's worth of holds at a
+time: reserving for a new payment intent replaces their earlier holds.
+
+The reservation is committed on its own, straight after the product
+updates, so a product row is locked only for the few statements between
+its update and that commit.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import delete, insert, select, update
+from app.database import AsyncSessionLocal
+from app.models.product import Product
+from app.models.quote import CheckoutQuote, StockHold
+from app.utils.pricing import CheckoutError, PricedCart
+
+logger = logging.getLogger(__name__)
+
+
+def available_quantity(product) -> int:
+    """Units that can still be sold or reserved"""
+    return (product.stock_quantity or 0) - (product.reserved_quantity or 0)
+
+
+def _insufficient(cart: PricedCart, product_id: str) -> CheckoutError:
+    return CheckoutError(400, f"Insufficient stock for {cart.product_name(product_id)}", reason="stock")
+
+
+async def reserve_stock(
+    db, payment_intent_id: str, user_id: Optional[str], cart: PricedCart, expires_at: datetime
+) -> None:
+    """Hold the cart's units until ``expires_at`` in place of the user's earlier holds; 400 if stock is short.
+
+    Runs in the caller's transaction, which should commit straight away: the
+    product rows stay locked until it does. A failure part-way is undone by
+    its rollback, earlier holds included.
+    """
+    quantities = cart.quantities()
+    # Replace rather than stack: retrying checkout must not hold the cart twice.
+    # Most shoppers have nothing held, and a read is enough to tell
+    previous: Dict[str, int] = {}
+    if user_id and await db.scalar(select(StockHold.id).where(StockHold.user_id == user_id).limit(1)):
+        previous = await _claim_holds(db, StockHold.user_id == user_id)
+
+    # Only the net change per product; always in the same order so overlapping carts can't deadlock
+    for product_id in sorted(set(quantities) | set(previous)):
+        change = quantities.get(product_id, 0) - previous.get(product_id, 0)
+        if not change:
+            continue
+        statement = (
+            update(Product)
+            .where(Product.id == product_id)
+            .values(reserved_quantity=Product.reserved_quantity + change)
+            .execution_options(synchronize_session=False)
+        )
+        if change > 0:
+            statement = statement.where(Product.stock_quantity - Product.reserved_quantity >= change)
+        result = await db.execute(statement)
+        if result.rowcount != 1 and change > 0:
+            raise _insufficient(cart, product_id)
+
+    await db.execute(insert(StockHold), [
+        {"payment_intent_id": payment_intent_id, "user_id": user_id, "product_id": product_id,
+         "quantity": quantity, "expires_at": expires_at}
+        for product_id, quantity in quantities.items()
+    ])
+
+
+async def _claim_holds(db, condition) -> Dict[str, int]:
+    """Delete the matching holds and return their units per product"""
+    result = await db.execute(
+        delete(StockHold).where(condition).returning(StockHold.product_id, StockHold.quantity)
+    )
+    claimed: Dict[str, int] = {}
+    for product_id, quantity in result.all():
+        claimed[product_id] = claimed.get(product_id, 0) + quantity
+    return claimed
+
+
+async def take_stock(
+    db, cart: PricedCart, payment_intent_id: Optional[str] = None
+) -> Dict[str, Tuple[int, int]]:
+    """Decrement stock for an order, converting its payment intent's holds into the sale.
+
+    Units still held for the intent come out of the reservation; any units
+    whose hold already lapsed must be covered by unreserved stock. Raises
+    400 if they can't be. Returns ``(new stock, reorder threshold)`` per product.
+    """
+    held = await _claim_holds(db, StockHold.payment_intent_id == payment_intent_id) if payment_intent_id else {}
+    quantities = cart.quantities()
+    remaining: Dict[str, Tuple[int, int]] = {}
+
+    for product_id in sorted(set(quantities) | set(held)):
+        quantity = quantities.get(product_id, 0)
+        from_hold = min(held.get(product_id, 0), quantity)
+        unheld = quantity - from_hold
+        released = held.get(product_id, 0) - from_hold  # held but no longer in the cart
+
+        result = await db.execute(
+            update(Product)
+            .where(
+                Product.id == product_id,
+                Product.reserved_quantity >= from_hold + released,
+                Product.stock_quantity - Product.reserved_quantity >= unheld
+            )
+            .values(
+                stock_quantity=Product.stock_quantity - quantity,
+                reserved_quantity=Product.reserved_quantity - from_hold - released
+            )
+            .returning(Product.stock_quantity, Product.reorder_threshold)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+        if row is None:
+            if quantity:
+                raise _insufficient(cart, product_id)
+        elif quantity:
+            remaining[product_id] = (row.stock_quantity, row.reorder_threshold)
+
+    return remaining
+
+
+async def _release(db, condition) -> int:
+    """Give the matching holds back to available stock; returns the units released"""
+    claimed = await _claim_holds(db, condition)
+    for product_id in sorted(claimed):
+        await db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(reserved_quantity=Product.reserved_quantity - claimed[product_id])
+            .execution_options(synchronize_session=False)
+        )
+    return sum(claimed.values())
+
+
+async def release_holds(db, payment_intent_id: str) -> int:
+    """Give a payment intent's holds back, in the caller's transaction"""
+    return await _release(db, StockHold.payment_intent_id == payment_intent_id)
+
+
+async def release_expired_holds(db, now: Optional[datetime] = None) -> int:
+    """Give expired holds back to available stock and drop expired quotes.
+
+    Returns the number of units released.
+    """
+    now = now or datetime.utcnow()
+    released = await _release(db, StockHold.expires_at <= now)
+    await db.execute(delete(CheckoutQuote).where(CheckoutQuote.expires_at <= now))
+    await db.commit()
+    return released
+
+
+async def run_hold_sweeper(interval: float) -> None:
+    """Release expired holds every ``interval`` seconds until cancelled"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                released = await release_expired_holds(db)
+            if released:
+                logger.info("Released %d expired stock hold unit(s)", released)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Stock hold sweep failed")
+        await asyncio.sleep(interval)
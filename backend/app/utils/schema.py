@@ -0,0 +1,114 @@
+"""Schema versioning: the Alembic migrations own the schema, the API only checks it.
+
+Deploys run ``alembic upgrade head`` as a separate step before any worker
+starts (the Procfile ``release`` process); workers never create tables. At
+startup each worker compares the database's revision with the newest one it
+ships with, a single-row read of ``alembic_version``, and refuses to serve a
+database that is missing migrations. A database on a revision this build
+doesn't know is only logged: it is most likely a newer release migrated
+ahead of a rolling deploy.
+
+The revision alone can be wrong (a database stamped rather than migrated),
+so the check also makes sure every table the models map, and the search
+index for the dialect, actually exist.
+"""
+import logging
+import os
+from functools import lru_cache
+from typing import FrozenSet
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def alembic_config() -> Config:
+    """alembic.ini, usable from any working directory, leaving the caller's logging alone"""
+    config = Config(ALEMBIC_INI, attributes={"configure_logging": False})
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+
+@lru_cache(maxsize=1)
+def _script() -> ScriptDirectory:
+    return ScriptDirectory.from_config(alembic_config())
+
+
+def head_revisions() -> FrozenSet[str]:
+    return frozenset(_script().get_heads())
+
+
+def known_revisions() -> FrozenSet[str]:
+    return frozenset(revision.revision for revision in _script().walk_revisions())
+
+
+def check_schema_version(connection) -> None:
+    """Raise SchemaVersionError unless the database is migrated to this build's head (sync connection)"""
+    current = frozenset(MigrationContext.configure(connection).get_current_heads())
+    expected = head_revisions()
+    if current == expected:
+        return
+    if not current:
+        raise SchemaVersionError(
+            "Database has no schema version. Run `alembic upgrade head` first "
+            "(`alembic stamp 0001` beforehand if its tables were created before migrations existed)."
+        )
+    if current - known_revisions():
+        logger.warning(
+            "Database is at revision %s, which this build doesn't know (head %s); assuming a newer release migrated it",
+            ", ".join(sorted(current)), ", ".join(sorted(expected))
+        )
+        return
+    raise SchemaVersionError(
+        f"Database is at revision {', '.join(sorted(current))}, this build needs "
+        f"{', '.join(sorted(expected))}. Run `alembic upgrade head`."
+    )
+
+
+def check_schema_objects(connection) -> None:
+    """Raise SchemaVersionError if a mapped table or the search index is missing (sync connection)"""
+    from app.database import Base
+    import app.models  # noqa: F401 - registers every table
+
+    inspector = inspect(connection)
+    missing = sorted(set(Base.metadata.tables) - set(inspector.get_table_names()))
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        if not connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+        ).first():
+            missing.append("products_fts")
+    elif dialect == "postgresql" and "products" not in missing:
+        if "search_vector" not in {column["name"] for column in inspector.get_columns("products")}:
+            missing.append("products.search_vector")
+    if missing:
+        raise SchemaVersionError(
+            f"Database is missing {', '.join(missing)} although its revision says otherwise "
+            "(stamped rather than migrated?). Stamp the revision it really matches, then run "
+            "`alembic upgrade head`."
+        )
+
+
+def check_schema(connection) -> None:
+    check_schema_version(connection)
+    check_schema_objects(connection)
+
+
+async def verify_schema(async_engine) -> None:
+    async with async_engine.connect() as connection:
+        await connection.run_sync(check_schema)
+
+
+def upgrade_database(revision: str = "head") -> None:
+    """``alembic upgrade`` the DATABASE_URL database, for scripts that build their own"""
+    command.upgrade(alembic_config(), revision)
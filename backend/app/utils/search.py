@@ -0,0 +1,136 @@
+"""Full-text search over the product catalog.
+
+SQLite uses an external-content FTS5 table kept in sync by triggers on
+``products``; PostgreSQL uses a stored, generated ``tsvector`` column with a
+GIN index. Both are maintained by the database itself, so every write path
+(``create_product``, ``update_product``, bulk loads) keeps the index current.
+"""
+import re
+from sqlalchemy import Table, Column, Integer, Text, MetaData, false, func, literal_column, or_, text
+from app.models.product import Product
+
+# Kept out of Base.metadata so create_all() never builds it as a plain table
+_search_metadata = MetaData()
+
+products_fts = Table(
+    "products_fts",
+    _search_metadata,
+    Column("rowid", Integer),
+    Column("name", Text),
+    Column("brand", Text),
+    Column("description", Text),
+    Column("rank", Text),
+)
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, brand, description,
+        content='products', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, brand, description)
+        VALUES (new.rowid, new.name, new.brand, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, brand, description)
+        VALUES ('delete', old.rowid, old.name, old.brand, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, brand, description ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, brand, description)
+        VALUES ('delete', old.rowid, old.name, old.brand, old.description);
+        INSERT INTO products_fts(rowid, name, brand, description)
+        VALUES (new.rowid, new.name, new.brand, new.description);
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(brand, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING GIN (search_vector)",
+]
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def ensure_search_index(bind) -> None:
+    """Create the search index for the connected dialect if it is missing"""
+    dialect = bind.dialect.name
+
+    with bind.begin() as conn:
+        if dialect == "sqlite":
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+            ).first()
+            for statement in SQLITE_DDL:
+                conn.execute(text(statement))
+            if not exists:
+                # Index rows that were written before the FTS table existed
+                conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+        elif dialect == "postgresql":
+            for statement in POSTGRES_DDL:
+                conn.execute(text(statement))
+
+
+def rebuild_search_index(bind) -> None:
+    """Rebuild the SQLite FTS index from the products table.
+
+    ``products`` has no INTEGER PRIMARY KEY, so VACUUM may renumber rowids;
+    run this after a VACUUM to re-align the index.
+    """
+    if bind.dialect.name == "sqlite":
+        with bind.begin() as conn:
+            conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+
+
+def _fts5_query(term: str) -> str:
+    """Turn free text into a safe FTS5 prefix query ("la mer" -> "la"* "mer"*)"""
+    tokens = _TOKEN_RE.findall(term)
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def apply_search(query, term: str, dialect: str, ranked: bool = True):
+    """Restrict a Product query to rows matching ``term``.
+
+    When ``ranked`` is true the query is ordered by relevance (best first);
+    callers add their own secondary ordering afterwards.
+    """
+    if dialect == "sqlite":
+        match = _fts5_query(term)
+        if not match:
+            return query.filter(false())
+        query = query.join(
+            products_fts, products_fts.c.rowid == literal_column("products.rowid")
+        ).filter(literal_column("products_fts").op("MATCH")(match))
+        if ranked:
+            # FTS5 rank is bm25(); lower is more relevant
+            query = query.order_by(products_fts.c.rank)
+        return query
+
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery("english", term)
+        vector = literal_column("products.search_vector")
+        query = query.filter(vector.op("@@")(tsquery))
+        if ranked:
+            query = query.order_by(func.ts_rank_cd(vector, tsquery).desc())
+        return query
+
+    # Other backends have no index we can use; keep the old behaviour
+    return query.filter(or_(
+        Product.name.ilike(f"%{term}%"),
+        Product.description.ilike(f"%{term}%"),
+    ))
@@ -0,0 +1,50 @@
+"""JSON serialization for API responses.
+
+``ORJSONResponse`` is the app's default response class (app/main.py), so
+bodies are encoded by orjson instead of the stdlib ``json``. Hot endpoints go
+further and return ``json_response(...)``: pydantic-core validates the ORM
+objects and writes JSON bytes in one pass with a ``TypeAdapter`` built once
+per response type, skipping FastAPI's dict round trip entirely.
+
+Money fields are typed ``Money``. By default they are encoded as strings
+("19.99"), which keeps cents exact; ``JSON_DECIMAL_MODE=number`` encodes
+them as JSON numbers instead.
+"""
+from decimal import Decimal
+from functools import lru_cache
+from typing import Annotated, Any, Dict, Optional
+from fastapi import Response
+from pydantic import PlainSerializer, TypeAdapter
+from app.config import settings
+
+if settings.JSON_DECIMAL_MODE == "number":
+    Money = Annotated[Decimal, PlainSerializer(float, return_type=float, when_used="json")]
+else:
+    Money = Decimal
+
+
+@lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter:
+    """The (cached) adapter for ``response_type``; building one compiles a validator and serializer"""
+    return TypeAdapter(response_type)
+
+
+def dump_json(response_type: Any, data: Any) -> bytes:
+    """Validate ``data`` (ORM objects or dicts) as ``response_type`` and encode it"""
+    adapter = type_adapter(response_type)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def json_response(
+    response_type: Any,
+    data: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Response with ``data`` serialized as ``response_type`` straight to bytes"""
+    return Response(
+        content=dump_json(response_type, data),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
@@ -0,0 +1,143 @@
+"""Per-request SQL statistics and a slow-query log.
+
+``instrument_engine`` hooks the cursor events of an engine (app/database.py
+does this for both engines). Each statement's duration is added to the
+stats of the request it runs in, found through a context variable that
+``SQLStatsMiddleware`` sets, and statements slower than
+``SLOW_QUERY_THRESHOLD_MS`` are kept in an in-memory ring buffer
+(``slow_queries``) that admins can read at /admin/slow-queries.
+
+The middleware reports the totals in a ``Server-Timing`` header, e.g.
+``db;dur=12.4;desc="7 queries", db-slowest;dur=8.1``, which browser dev
+tools display next to the request. Only statement text is kept, never
+bound parameters.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import event
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Long statements (bulk inserts) are cut to this many characters in the log
+_MAX_STATEMENT_LENGTH = 2000
+
+
+def route_label(scope: dict) -> str:
+    """Route template (``/api/v1/orders/{order_id}``) once routing has run, else the raw path"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get("path", "")
+
+
+class RequestSQLStats:
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def add(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        if duration > self.slowest:
+            self.slowest = duration
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        timing = f'db;dur={self.total * 1000:.1f};desc="{self.count} queries"'
+        if self.count:
+            timing += f", db-slowest;dur={self.slowest * 1000:.1f}"
+        return timing
+
+
+class SlowQueryLog:
+    """Ring buffer of the most recent slow statements"""
+
+    def __init__(self, size: int = 200):
+        self._entries: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float, executemany: bool, stats: Optional[RequestSQLStats]) -> None:
+        scope = stats.scope if stats else None
+        entry = {
+            "occurred_at": datetime.utcnow(),
+            "duration_ms": round(duration * 1000, 2),
+            "method": scope.get("method") if scope else None,
+            "route": route_label(scope) if scope else None,
+            "executemany": executemany,
+            "statement": statement[:_MAX_STATEMENT_LENGTH],
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self) -> List[dict]:
+        """Newest first"""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+current_stats: ContextVar[Optional[RequestSQLStats]] = ContextVar("current_sql_stats", default=None)
+slow_queries = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._sql_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_sql_stats_started", None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    stats = current_stats.get()
+    if stats is not None:
+        stats.add(statement, duration)
+    if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        slow_queries.record(statement, duration, executemany, stats)
+        logger.warning("Slow query (%.1f ms): %s", duration * 1000, statement[:200])
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement ``engine`` (sync or async) runs"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLStatsMiddleware:
+    """Collect SQL stats for each HTTP request and report them in ``Server-Timing``"""
+
+    def __init__(self, app, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSQLStats(scope)
+        token = current_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and self.server_timing:
+                # Streamed bodies keep querying after this; the header covers work up to the first byte
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_stats.reset(token)
@@ -0,0 +1,159 @@
+"""Incremental maintenance of the daily_stats rollup.
+
+Writers call the ``record_*`` helpers inside their own transaction, so the
+rollup commits (or rolls back) together with the order or user it counts.
+On PostgreSQL and SQLite each helper is a single atomic upsert, safe under
+concurrent checkouts; other databases get an UPDATE, then an INSERT in a
+savepoint if the day has no row yet.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.order import Order, OrderStatus
+from app.models.stats import DailyStats
+from app.models.user import User
+
+REVENUE_STATUSES = {
+    OrderStatus.PAID.value,
+    OrderStatus.PROCESSING.value,
+    OrderStatus.SHIPPED.value,
+    OrderStatus.DELIVERED.value,
+}
+
+_table = DailyStats.__table__
+
+
+def _status_value(status) -> str:
+    return OrderStatus(status).value
+
+
+def _status_column(status) -> str:
+    return f"{_status_value(status)}_orders"
+
+
+def _row_values(deltas: Dict[str, object]) -> Dict[str, object]:
+    values = {column.name: 0 for column in _table.columns if column.name != "date"}
+    values.update(deltas)
+    return values
+
+
+def _upsert(dialect_insert, day: date, deltas: Dict[str, object]):
+    """INSERT the day's row or add ``deltas`` to the existing counters"""
+    statement = dialect_insert(_table).values(date=day, **_row_values(deltas))
+    return statement.on_conflict_do_update(
+        index_elements=[_table.c.date],
+        set_={name: _table.c[name] + statement.excluded[name] for name in deltas},
+    )
+
+
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _apply(db, day: date, deltas: Dict[str, object]) -> None:
+    """Add ``deltas`` to the day's counters (sync session)"""
+    dialect_insert = _DIALECT_INSERTS.get(db.bind.dialect.name)
+    if dialect_insert is not None:
+        db.execute(_upsert(dialect_insert, day, deltas))
+        return
+
+    increment = update(_table).where(_table.c.date == day).values(
+        {name: _table.c[name] + value for name, value in deltas.items()}
+    )
+    if db.execute(increment).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(_table).values(date=day, **_row_values(deltas)))
+    except IntegrityError:
+        # Another transaction inserted the day first
+        db.execute(increment)
+
+
+async def record_order_created(db, order: Order) -> None:
+    """Count a newly flushed order on the day it was created"""
+    status = _status_value(order.status)
+    deltas = {"order_count": 1, _status_column(status): 1}
+    if status in REVENUE_STATUSES:
+        deltas["revenue"] = Decimal(str(order.total_amount))
+
+    await db.run_sync(_apply, order.created_at.date(), deltas)
+
+
+async def record_order_status_change(db, order: Order, old_status, new_status) -> None:
+    """Move an order between status counters (and in/out of revenue)"""
+    old_status, new_status = _status_value(old_status), _status_value(new_status)
+    if old_status == new_status:
+        return
+
+    deltas = {_status_column(old_status): -1, _status_column(new_status): 1}
+    was_revenue, is_revenue = old_status in REVENUE_STATUSES, new_status in REVENUE_STATUSES
+    if was_revenue != is_revenue:
+        amount = Decimal(str(order.total_amount))
+        deltas["revenue"] = amount if is_revenue else -amount
+
+    await db.run_sync(_apply, order.created_at.date(), deltas)
+
+
+async def record_user_created(db, user: User) -> None:
+    """Count a newly flushed user on the day they signed up"""
+    await db.run_sync(record_user_created_sync, user)
+
+
+def record_user_created_sync(db, user: User) -> None:
+    """record_user_created for a sync session (scripts such as create_admin.py)"""
+    _apply(db, user.created_at.date(), {"new_users": 1})
+
+
+def _as_date(value) -> date:
+    # func.date() comes back as a string on SQLite
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def rebuild_daily_stats(db) -> int:
+    """Recompute the whole rollup from orders and users (sync session).
+
+    Used for the initial backfill and to repair drift. Returns the number
+    of days written.
+    """
+    days: Dict[date, Dict[str, object]] = {}
+
+    def row(day):
+        return days.setdefault(day, {"date": day, "revenue": Decimal("0"), "order_count": 0, "new_users": 0})
+
+    order_day = func.date(Order.created_at)
+    order_totals = db.execute(
+        select(order_day, Order.status, func.count(Order.id), func.sum(Order.total_amount))
+        .group_by(order_day, Order.status)
+    ).all()
+    for day, status, count, amount in order_totals:
+        if day is None:
+            continue
+        entry = row(_as_date(day))
+        column = _status_column(status)
+        entry[column] = entry.get(column, 0) + count
+        entry["order_count"] += count
+        if _status_value(status) in REVENUE_STATUSES:
+            entry["revenue"] += Decimal(str(amount or 0))
+
+    user_day = func.date(User.created_at)
+    for day, count in db.execute(select(user_day, func.count(User.id)).group_by(user_day)).all():
+        if day is None:
+            continue
+        row(_as_date(day))["new_users"] += count
+
+    db.execute(delete(DailyStats))
+    if days:
+        db.execute(insert(_table), [
+            {**{column.name: 0 for column in _table.columns}, **values}
+            for values in days.values()
+        ])
+    db.commit()
+
+    return len(days)
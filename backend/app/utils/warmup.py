@@ -0,0 +1,72 @@
+"""Optional warm-up before a worker starts accepting requests (``STARTUP_WARMUP``).
+
+Opens the request pool's connections up front, so the first requests don't
+each pay for a new database connection, and replays a few hot GET routes
+through the app. That fills the catalog response cache and builds the
+compiled-SQL, serializer and route caches those routes depend on. Runs in
+the lifespan, so the server reports ready only once it has finished.
+"""
+import logging
+from contextlib import AsyncExitStack
+from typing import Iterable
+from sqlalchemy import text
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def open_pool_connections(async_engine) -> int:
+    """Check out a pool's worth of connections at once and hand them back open"""
+    size = getattr(async_engine.sync_engine.pool, "size", None)
+    # Pools that keep nothing (SQLite's NullPool) still benefit from one connect: dialect setup
+    count = size() if size else 1
+    async with AsyncExitStack() as stack:
+        for _ in range(count):
+            connection = await stack.enter_async_context(async_engine.connect())
+            await connection.execute(text("SELECT 1"))
+    return count
+
+
+async def _get(app, path: str) -> int:
+    """Send a GET for ``path`` through the ASGI app and return the status code"""
+    path, _, query = path.partition("?")
+    host = next((host for host in settings.ALLOWED_HOSTS if "*" not in host), "localhost")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", host.encode())],
+        "client": ("127.0.0.1", 0),
+        "server": (host, 80),
+    }
+    status = 500
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def prime_routes(app, paths: Iterable[str]) -> None:
+    for path in paths:
+        status = await _get(app, path)
+        if status >= 400:
+            logger.warning("Warm-up request to %s returned %d", path, status)
+
+
+async def warm_up(app, async_engine) -> None:
+    connections = await open_pool_connections(async_engine)
+    await prime_routes(app, settings.STARTUP_WARMUP_PATHS)
+    logger.info("Warmed up %d connection(s) and %d route(s)", connections, len(settings.STARTUP_WARMUP_PATHS))
@@ -0,0 +1,25 @@
+"""Rebuild the admin dashboard rollup (daily_stats) from order and user history"""
+import sys
+sys.path.insert(0, '.')
+
+from app.database import SessionLocal
+from app.models import DailyStats  # noqa: F401 - registers every table
+from app.utils.schema import upgrade_database
+from app.utils.stats import rebuild_daily_stats
+
+# Apply any pending migrations (alembic upgrade head)
+upgrade_database()
+
+
+def backfill():
+    db = SessionLocal()
+
+    try:
+        days = rebuild_daily_stats(db)
+        print(f"Rebuilt daily stats for {days} day(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill()
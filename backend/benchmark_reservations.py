@@ -0,0 +1,115 @@
+"""Contention benchmark for stock reservations (a limited-edition drop)
+
+Many shoppers try to reserve the last units of one product at once. Checks
+that exactly ``--stock`` reservations succeed (no overselling) and reports
+throughput and latency. Uses a throwaway SQLite database unless
+``--database-url`` points at a scratch database (migrated to head first).
+
+    python benchmark_reservations.py --shoppers 500 --stock 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+sys.path.insert(0, '.')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shoppers", type=int, default=500)
+    parser.add_argument("--stock", type=int, default=20)
+    parser.add_argument("--quantity", type=int, default=1, help="units each shopper wants")
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL of a scratch database")
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = args.database_url or (
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='reservations_'), 'bench.db')}"
+)
+
+from datetime import datetime, timedelta  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from app.database import AsyncSessionLocal, SessionLocal, async_engine  # noqa: E402
+from app.models import Category, Product  # noqa: E402
+from app.utils.pricing import PricedCart, PricedLine  # noqa: E402
+from app.utils.reservations import available_quantity, reserve_stock  # noqa: E402
+from app.utils.schema import upgrade_database  # noqa: E402
+
+
+def seed() -> str:
+    upgrade_database()
+    db = SessionLocal()
+    try:
+        category = Category(name="Bench", slug=f"bench-{time.time_ns()}")
+        db.add(category)
+        db.flush()
+        product = Product(
+            name="Limited Drop", slug=f"limited-drop-{time.time_ns()}", brand="Bench",
+            category_id=category.id, price=100, stock_quantity=args.stock
+        )
+        db.add(product)
+        db.commit()
+        return product.id
+    finally:
+        db.close()
+
+
+async def shopper(n: int, product_id: str, latencies: list) -> bool:
+    cart = PricedCart(
+        lines=[PricedLine(
+            product_id=product_id, product_name="Limited Drop", quantity=args.quantity,
+            unit_price=100, stock_quantity=0
+        )],
+        subtotal=100, shipping=0, tax=0, total=100
+    )
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            try:
+                await reserve_stock(
+                    db, f"pi_bench_{n}", f"bench_user_{n}", cart, datetime.utcnow() + timedelta(minutes=15)
+                )
+                await db.commit()
+                return True
+            except HTTPException:
+                await db.rollback()
+                return False
+    finally:
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(product_id: str) -> int:
+    latencies: list = []
+    started = time.perf_counter()
+    results = await asyncio.gather(*(shopper(n, product_id, latencies) for n in range(args.shoppers)))
+    elapsed = time.perf_counter() - started
+
+    async with AsyncSessionLocal() as db:
+        product = (await db.execute(select(Product).filter(Product.id == product_id))).scalar_one()
+    await async_engine.dispose()
+
+    won = sum(results)
+    expected = min(args.shoppers, args.stock // args.quantity)
+    latencies.sort()
+    print(f"{args.shoppers} shoppers, {args.stock} units, {args.quantity} per shopper")
+    print(f"  reserved by {won} shopper(s), expected {expected}")
+    print(f"  stock {product.stock_quantity}, reserved {product.reserved_quantity}, "
+          f"available {available_quantity(product)}")
+    print(f"  {elapsed:.3f}s total, {args.shoppers / elapsed:.0f} attempts/s")
+    print(f"  latency p50 {statistics.median(latencies) * 1000:.1f}ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms, "
+          f"max {latencies[-1] * 1000:.1f}ms")
+
+    if won != expected or product.reserved_quantity != won * args.quantity or available_quantity(product) < 0:
+        print("Reservation counts are inconsistent (oversold or lost holds)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(seed())))
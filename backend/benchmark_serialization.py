@@ -0,0 +1,104 @@
+"""Serialization cost of one product listing page
+
+Builds a page of ``--items`` Product objects (no database) and times each
+way of turning it into a response body:
+
+- jsonable_encoder + json: FastAPI's encoder for routes without a
+  response model, then the stdlib ``json`` module
+- response_model + JSONResponse: FastAPI's default path before orjson
+- response_model + ORJSONResponse: the same with the app's default class
+- TypeAdapter.dump_json: ``json_response`` / the catalog cache, validation
+  and encoding in one pass inside pydantic-core
+
+    python benchmark_serialization.py --items 100
+    JSON_DECIMAL_MODE=number python benchmark_serialization.py
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+sys.path.insert(0, '.')
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.schemas.product import ProductResponse  # noqa: E402
+from app.utils.serialization import dump_json, type_adapter  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="products per page")
+    parser.add_argument("--rounds", type=int, default=2000, help="pages serialized per method")
+    return parser.parse_args()
+
+
+def build_page(items: int) -> List[Product]:
+    category_id = str(uuid.uuid4())
+    started = datetime(2026, 1, 1)
+    return [
+        Product(
+            id=str(uuid.uuid4()), name=f"Hydrating Serum {n}", slug=f"hydrating-serum-{n}",
+            description="Lightweight serum with hyaluronic acid for all-day hydration.",
+            brand="Brands Galaxy", category_id=category_id, price=Decimal("49.99") + n,
+            discount_price=Decimal("39.99") + n if n % 3 == 0 else None, stock_quantity=n,
+            images=[f"https://cdn.example.com/products/{n}/1.jpg", f"https://cdn.example.com/products/{n}/2.jpg"],
+            is_featured=n % 10 == 0, is_active=True, created_at=started + timedelta(minutes=n)
+        )
+        for n in range(items)
+    ]
+
+
+def main() -> int:
+    args = parse_args()
+    page = build_page(args.items)
+    response_type = List[ProductResponse]
+    field = create_response_field(name="Response_list_products", type_=response_type, mode="serialization")
+
+    def encoder_and_json() -> bytes:
+        models = [ProductResponse.model_validate(product) for product in page]
+        return JSONResponse(jsonable_encoder(models)).body
+
+    loop = asyncio.new_event_loop()
+
+    def through_fastapi(response_class):
+        # serialize_response is a coroutine, as FastAPI awaits it per request
+        def run() -> bytes:
+            content = loop.run_until_complete(serialize_response(field=field, response_content=page))
+            return response_class(content).body
+        return run
+
+    methods = {
+        "jsonable_encoder + json": encoder_and_json,
+        "response_model + JSONResponse": through_fastapi(JSONResponse),
+        "response_model + ORJSONResponse": through_fastapi(ORJSONResponse),
+        "TypeAdapter.dump_json": lambda: dump_json(response_type, page),
+    }
+
+    type_adapter(response_type)  # Built on first use, then reused by every request
+    print(f"{args.items} products per page, {args.rounds} pages per method, "
+          f"decimals as {settings.JSON_DECIMAL_MODE}")
+    baseline = None
+    for label, method in methods.items():
+        body = method()
+        for _ in range(min(50, args.rounds)):
+            method()
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            method()
+        per_page = (time.perf_counter() - started) / args.rounds * 1e6
+        baseline = baseline or per_page
+        print(f"  {label:<34} {per_page:8.0f} us/page  {baseline / per_page:5.1f}x  {len(body)} bytes")
+    loop.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
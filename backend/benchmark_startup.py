@@ -0,0 +1,122 @@
+"""Worker startup time, and the latency of the first requests it serves
+
+Starts fresh Python processes and times each startup phase:
+
+- import: importing app.main
+- startup: the lifespan up to readiness (schema version check, warm-up)
+- ready: process spawn to ready, including the interpreter itself
+- first requests: the STARTUP_WARMUP_PATHS routes, fetched once right after
+
+The modes compared are: the old create_all() at import, the version check
+alone, and the version check plus STARTUP_WARMUP. Uses a throwaway SQLite
+database unless ``--database-url`` points at one migrated to head (a
+generate_catalog.py database makes first-request numbers realistic).
+
+    python benchmark_startup.py --rounds 5
+    python benchmark_startup.py --database-url sqlite:////tmp/catalog.db
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+sys.path.insert(0, '.')
+
+MODES = {
+    "create_all at import (before)": {"SCHEMA_VERSION_CHECK": "false", "STARTUP_WARMUP": "false"},
+    "version check": {"SCHEMA_VERSION_CHECK": "true", "STARTUP_WARMUP": "false"},
+    "version check + warm-up": {"SCHEMA_VERSION_CHECK": "true", "STARTUP_WARMUP": "true"},
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5, help="processes started per mode")
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL of a database migrated to head")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--create-all", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def child(create_all: bool) -> None:
+    """One startup, reported as JSON on stdout"""
+    import asyncio
+    import httpx
+
+    started = time.perf_counter()
+    from app.main import app
+    if create_all:
+        # What importing app.main used to do
+        from app.database import Base, engine
+        from app.utils.search import ensure_search_index
+        Base.metadata.create_all(bind=engine)
+        ensure_search_index(engine)
+    imported = time.perf_counter()
+
+    async def run() -> dict:
+        from app.config import settings
+        from app.database import async_engine
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            ready_wall = time.time()
+            first = {}
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+                for path in settings.STARTUP_WARMUP_PATHS:
+                    request_started = time.perf_counter()
+                    await client.get(path)
+                    first[path] = (time.perf_counter() - request_started) * 1000
+        await async_engine.dispose()
+        return {
+            "import_ms": (imported - started) * 1000,
+            "startup_ms": (ready - imported) * 1000,
+            "ready_ms": (ready_wall - float(os.environ["BENCH_SPAWNED_AT"])) * 1000,
+            "first_requests_ms": first,
+        }
+
+    print(json.dumps(asyncio.run(run())))
+
+
+def main() -> int:
+    args = parse_args()
+    if args.child:
+        child(args.create_all)
+        return 0
+
+    env = dict(os.environ, JOB_WORKER_IN_PROCESS="false", METRICS_ENABLED="true")
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    else:
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='startup_'), 'bench.db')}"
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], env=env, check=True,
+                       capture_output=True)
+
+    print(f"{args.rounds} process start(s) per mode, medians in ms")
+    print(f"  {'mode':<32} {'import':>8} {'startup':>8} {'ready':>8} {'1st reqs':>9}")
+    for label, settings in MODES.items():
+        runs = []
+        for _ in range(args.rounds):
+            command = [sys.executable, __file__, "--child"] + (["--create-all"] if "create_all" in label else [])
+            result = subprocess.run(
+                command, env=dict(env, BENCH_SPAWNED_AT=repr(time.time()), **settings),
+                capture_output=True, text=True
+            )
+            if result.returncode != 0:
+                print(result.stderr)
+                return 1
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+        def median(key):
+            return statistics.median(run[key] for run in runs)
+
+        first = statistics.median(sum(run["first_requests_ms"].values()) for run in runs)
+        print(f"  {label:<32} {median('import_ms'):8.0f} {median('startup_ms'):8.0f} "
+              f"{median('ready_ms'):8.0f} {first:9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Bulk import or export products as CSV or NDJSON
+
+    python bulk_products.py import supplier_feed.csv
+    python bulk_products.py import feed.ndjson --format ndjson
+    python bulk_products.py export products.csv
+"""
+import argparse
+import os
+import sys
+sys.path.insert(0, '.')
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Product  # noqa: F401 - registers every table
+from app.utils.export import FORMATS, export_header, export_line
+from app.utils.product_io import (
+    EXPORT_COLUMNS, ProductImporter, category_lookup_query, export_query, read_rows, write_chunk
+)
+from app.utils.schema import upgrade_database
+
+# Apply any pending migrations (alembic upgrade head)
+upgrade_database()
+
+
+def _format(path: str, explicit: str) -> str:
+    if explicit:
+        return explicit
+    return "ndjson" if os.path.splitext(path)[1].lower() in (".ndjson", ".jsonl") else "csv"
+
+
+def import_products(path: str, fmt: str, chunk_size: int) -> int:
+    db = SessionLocal()
+
+    try:
+        importer = ProductImporter(
+            dict(db.execute(category_lookup_query()).all()),
+            chunk_size=chunk_size,
+            max_errors=settings.PRODUCT_IMPORT_MAX_ERRORS
+        )
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            for values in importer.chunks(read_rows(stream, fmt)):
+                write_chunk(db, values)
+                db.commit()
+                print(f"  {importer.imported} imported, {importer.failed} failed")
+    finally:
+        db.close()
+
+    report = importer.report()
+    for error in report["errors"]:
+        print(f"Line {error.line} ({error.slug or '-'}): {'; '.join(error.errors)}")
+    if report["errors_truncated"]:
+        print(f"... {report['failed'] - len(report['errors'])} more error(s) not shown")
+    print(f"Processed {report['processed']} row(s): {report['imported']} imported, {report['failed']} failed")
+    return 1 if report["failed"] else 0
+
+
+def export_products(path: str, fmt: str) -> int:
+    db = SessionLocal()
+    count = 0
+
+    try:
+        with open(path, "w", encoding="utf-8", newline="") as out:
+            out.write(export_header(fmt, EXPORT_COLUMNS))
+            for row in db.execute(export_query().execution_options(yield_per=1000)):
+                out.write(export_line(fmt, EXPORT_COLUMNS, row._mapping))
+                count += 1
+    finally:
+        db.close()
+
+    print(f"Exported {count} product(s) to {path}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=settings.PRODUCT_IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = _format(args.path, args.format)
+    if args.action == "import":
+        return import_products(args.path, fmt, args.chunk_size)
+    return export_products(args.path, fmt)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,12 +2,14 @@
 import sys
 sys.path.insert(0, '.')
 
-from app.database import SessionLocal, Base, engine
+from app.database import SessionLocal
 from app.models.user import User
+from app.utils.schema import upgrade_database
+from app.utils.stats import record_user_created_sync
 import bcrypt
 
-# Create tables if they don't exist
-Base.metadata.create_all(bind=engine)
+# Apply any pending migrations (alembic upgrade head)
+upgrade_database()
 
 
 def hash_password(password: str) -> str:
@@ -35,6 +37,8 @@ def create_admin():
         )
 
         db.add(admin)
+        db.flush()
+        record_user_created_sync(db, admin)
         db.commit()
 
         print("Admin user created successfully!")
@@ -0,0 +1,78 @@
+"""Gunicorn settings: the API as several Uvicorn worker processes
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+One worker per available CPU unless WEB_CONCURRENCY says otherwise. The
+app is imported once in the master (``preload_app``) and forked, so workers
+start quickly and share its memory; each worker then drops the database
+pools it inherited. Workers are replaced after roughly
+GUNICORN_MAX_REQUESTS requests, spread out by a random jitter so they don't
+all restart together; a retiring worker finishes its in-flight requests
+first (up to ``graceful_timeout``).
+
+Set PROMETHEUS_MULTIPROC_DIR so /metrics covers every worker. The directory
+is created, or emptied, when this file is loaded: that has to happen before
+the app is preloaded, which comes before gunicorn's first server hook.
+"""
+import glob
+import math
+import os
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, honouring CPU affinity and a cgroup (container) quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY") or available_cpus())
+# Read by app.database to split DB_CONNECTION_BUDGET between the workers
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+preload_app = True
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", str(max_requests // 10)))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+timeout = 60
+keepalive = 5
+accesslog = "-"
+# Heartbeat files on a tmpfs, so a slow container disk can't get workers killed
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+_multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if _multiproc_dir:
+    # Importing the app opens its metric files here, and samples left by a
+    # previous run would be summed with this one's
+    os.makedirs(_multiproc_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(_multiproc_dir, "*.db")):
+        os.remove(path)
+
+
+def when_ready(server):
+    # Preloading set gauges in the master, which never serves; only workers should count
+    if _multiproc_dir:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def post_fork(server, worker):
+    from app.database import reset_after_fork
+    reset_after_fork()
+
+
+def child_exit(server, worker):
+    if _multiproc_dir:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,388 @@
+"""Replay a browse/search/checkout/admin traffic mix against the app in-process
+
+Drives the ASGI app through httpx (no server, no network) with
+``--users`` concurrent virtual shoppers and reports latency percentiles
+and throughput per endpoint. Build the database first with
+generate_catalog.py; products, categories, customers and the admin are
+sampled from it. ``--seed`` fixes every shopper's choices, so runs against
+databases generated with the same arguments replay the same traffic.
+
+    python loadtest.py --duration 60 --save baselines/main.json
+    python loadtest.py --duration 60 --compare baselines/main.json --max-regression 15
+    python loadtest.py --mix browse=50,search=20,checkout=25,admin=5 --no-cache
+
+Numbers are for comparing runs on the same machine: the load generator
+shares the process and event loop with the app.
+"""
+import argparse
+import os
+import sys
+sys.path.insert(0, '.')
+
+MIX = {"browse": 65, "search": 15, "checkout": 15, "admin": 5}
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in MIX:
+            raise argparse.ArgumentTypeError(f"unknown scenario '{name.strip()}' (choose from {', '.join(MIX)})")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual shoppers")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of unmeasured load first")
+    parser.add_argument("--mix", type=parse_mix, default=MIX,
+                        help="scenario weights, default " + ",".join(f"{k}={v}" for k, v in MIX.items()))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-cache", action="store_true", help="disable the catalog response cache")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--max-regression", type=float,
+                        help="with --compare, exit 1 if any endpoint's p95 is this many percent slower")
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL; defaults to DATABASE_URL")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    # Before the app is imported: both are read when its modules load
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    if args.no_cache:
+        os.environ["CATALOG_CACHE_TTL_SECONDS"] = "0"
+
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import logging  # noqa: E402
+import math  # noqa: E402
+import platform  # noqa: E402
+import random  # noqa: E402
+import subprocess  # noqa: E402
+import time  # noqa: E402
+import uuid  # noqa: E402
+from datetime import datetime  # noqa: E402
+from typing import Optional  # noqa: E402
+import httpx  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import SessionLocal, async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Category, Order, Product, User  # noqa: E402
+from app.utils.auth import create_access_token  # noqa: E402
+from app.utils.sql_stats import slow_queries  # noqa: E402
+
+# Slow statements are summarized after the report instead of logged mid-run
+logging.getLogger("app.utils.sql_stats").setLevel(logging.ERROR)
+
+API = f"/api/{settings.API_VERSION}"
+SAMPLE_SIZE = 500
+
+
+def percentile(ordered: list, p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+class Fixtures:
+    """What the shoppers pick from, sampled once from the database"""
+
+    def __init__(self, db):
+        rng = random.Random(args.seed)
+        active = select(Product.id, Product.slug).filter(Product.is_active == True)  # noqa: E712
+        # ORDER BY random() scans the table once; fine for a one-off setup step
+        self.products = db.execute(active.order_by(func.random()).limit(SAMPLE_SIZE)).all()
+        self.stocked = db.execute(
+            select(Product.id).filter(Product.is_active == True, Product.stock_quantity >= 50)  # noqa: E712
+            .order_by(func.random()).limit(SAMPLE_SIZE)
+        ).scalars().all()
+        self.categories = db.execute(select(Category.id).order_by(Category.slug)).scalars().all()
+        self.departments = db.execute(
+            select(Category.id).filter(Category.parent_id.is_(None)).order_by(Category.slug)
+        ).scalars().all()
+
+        names = db.execute(active.with_only_columns(Product.name).limit(SAMPLE_SIZE)).scalars().all()
+        brands = db.execute(select(Product.brand).distinct().limit(50)).scalars().all()
+        words = sorted({word for name in names for word in name.split() if len(word) > 3} | set(brands))
+        self.search_terms = rng.sample(words, min(len(words), 100))
+
+        customers = db.execute(
+            select(User.id).filter(User.is_admin == False, User.is_active == True)  # noqa: E712
+            .order_by(User.created_at).limit(max(args.users, 1) * 10)
+        ).scalars().all()
+        self.customer_tokens = [create_access_token({"sub": user_id}) for user_id in customers]
+        admin = db.execute(select(User.id).filter(User.is_admin == True).limit(1)).scalar()  # noqa: E712
+        self.admin_token = create_access_token({"sub": admin}) if admin else None
+
+        self.counts = {
+            "products": db.scalar(select(func.count()).select_from(Product)),
+            "users": db.scalar(select(func.count()).select_from(User)),
+            "orders": db.scalar(select(func.count()).select_from(Order)),
+        }
+
+    def missing(self) -> list:
+        problems = []
+        if not self.products or not self.categories:
+            problems.append("no products or categories (run generate_catalog.py)")
+        if args.mix.get("checkout") and (not self.customer_tokens or not self.stocked):
+            problems.append("checkout needs customers and products with stock")
+        if args.mix.get("admin") and not self.admin_token:
+            problems.append("admin needs an admin user")
+        return problems
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.error_statuses = {}
+        self.measuring = False
+
+    def add(self, label: str, seconds: float, status: Optional[int], ok: bool) -> None:
+        if not self.measuring:
+            return
+        self.latencies.setdefault(label, []).append(seconds)
+        if not ok:
+            self.errors[label] = self.errors.get(label, 0) + 1
+            statuses = self.error_statuses.setdefault(label, {})
+            key = str(status or "exception")
+            statuses[key] = statuses.get(key, 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {}
+        for label in sorted(self.latencies):
+            ordered = sorted(self.latencies[label])
+            endpoints[label] = {
+                "requests": len(ordered),
+                "errors": self.errors.get(label, 0),
+                "error_statuses": self.error_statuses.get(label, {}),
+                "throughput": round(len(ordered) / elapsed, 2),
+                "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+            }
+        everything = sorted(latency for latencies in self.latencies.values() for latency in latencies)
+        total = {
+            "requests": len(everything),
+            "errors": sum(self.errors.values()),
+            "throughput": round(len(everything) / elapsed, 2),
+        }
+        if everything:
+            total.update(p50_ms=round(percentile(everything, 50) * 1000, 2),
+                         p95_ms=round(percentile(everything, 95) * 1000, 2),
+                         p99_ms=round(percentile(everything, 99) * 1000, 2),
+                         max_ms=round(everything[-1] * 1000, 2))
+        return {"endpoints": endpoints, "total": total}
+
+
+class Shopper:
+    def __init__(self, n: int, client: httpx.AsyncClient, fixtures: Fixtures, recorder: Recorder):
+        self.rng = random.Random(f"{args.seed}:{n}")
+        self.client = client
+        self.fixtures = fixtures
+        self.recorder = recorder
+        tokens = fixtures.customer_tokens
+        self.auth = {"Authorization": f"Bearer {tokens[n % len(tokens)]}"} if tokens else {}
+        self.admin_auth = {"Authorization": f"Bearer {fixtures.admin_token}"}
+        self.scenarios = [name for name, weight in args.mix.items() if weight > 0]
+        self.weights = [args.mix[name] for name in self.scenarios]
+
+    async def request(self, label: str, method: str, url: str, expect=(200,), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except Exception:
+            self.recorder.add(label, time.perf_counter() - started, None, False)
+            return None
+        self.recorder.add(label, time.perf_counter() - started, response.status_code,
+                          response.status_code in expect)
+        return response
+
+    async def run(self, stop_at: float) -> None:
+        while time.perf_counter() < stop_at:
+            scenario = self.rng.choices(self.scenarios, self.weights)[0]
+            await getattr(self, scenario)()
+
+    async def browse(self) -> None:
+        rng, fixtures = self.rng, self.fixtures
+        roll = rng.random()
+        if roll < 0.25:
+            first = await self.request("list products", "GET", f"{API}/products/", params={"limit": 20})
+            cursor = first.headers.get("x-next-cursor") if first is not None else None
+            if cursor and rng.random() < 0.5:
+                await self.request("list products (next page)", "GET", f"{API}/products/",
+                                   params={"limit": 20, "cursor": cursor})
+        elif roll < 0.35:
+            await self.request("list products (sorted by price)", "GET", f"{API}/products/",
+                               params={"sort_by": "price", "sort_order": rng.choice(["asc", "desc"]), "limit": 20})
+        elif roll < 0.5:
+            await self.request("list products (category)", "GET", f"{API}/products/",
+                               params={"category": rng.choice(fixtures.categories), "limit": 20})
+        elif roll < 0.6:
+            await self.request("list products (category subtree)", "GET", f"{API}/products/",
+                               params={"category": rng.choice(fixtures.departments),
+                                       "include_descendants": "true", "limit": 20})
+        elif roll < 0.95:
+            product = rng.choice(fixtures.products)
+            await self.request("get product", "GET", f"{API}/products/{rng.choice(product)}")
+        else:
+            await self.request("category tree", "GET", f"{API}/products/categories/tree")
+
+    async def search(self) -> None:
+        params = {"search": self.rng.choice(self.fixtures.search_terms), "limit": 20}
+        if self.rng.random() < 0.3:
+            params["sort_by"] = "price"
+        await self.request("search products", "GET", f"{API}/products/", params=params)
+
+    async def checkout(self) -> None:
+        rng = self.rng
+        items = [{"product_id": product_id, "quantity": rng.randint(1, 2)}
+                 for product_id in rng.sample(self.fixtures.stocked, min(rng.randint(1, 3), len(self.fixtures.stocked)))]
+        address = {"line1": "1 Main St", "city": "Chicago", "postal_code": "60601", "country": "US"}
+        intent = await self.request(
+            "create payment intent", "POST", f"{API}/orders/create-payment-intent",
+            json={"items": items, "shipping_address": address}, headers=self.auth
+        )
+        if intent is None or intent.status_code != 200:
+            return
+        await self.request(
+            "create order", "POST", f"{API}/orders/", expect=(201,),
+            json={"items": items, "shipping_address": address,
+                  "payment_intent_id": intent.json()["paymentIntentId"]},
+            # Fresh per run: a key replayed from an earlier run would be refused as reused
+            headers={**self.auth, "Idempotency-Key": str(uuid.uuid4())}
+        )
+        if rng.random() < 0.3:
+            await self.request("list my orders", "GET", f"{API}/orders/", headers=self.auth)
+
+    async def admin(self) -> None:
+        roll = self.rng.random()
+        if roll < 0.4:
+            await self.request("admin dashboard", "GET", f"{API}/admin/dashboard", headers=self.admin_auth)
+        elif roll < 0.8:
+            params = {"limit": 20}
+            if self.rng.random() < 0.5:
+                params["status"] = self.rng.choice(["paid", "processing", "shipped"])
+            await self.request("admin orders", "GET", f"{API}/admin/orders", params=params, headers=self.admin_auth)
+        else:
+            await self.request("admin low stock", "GET", f"{API}/admin/products/low-stock", headers=self.admin_auth)
+
+
+async def run(fixtures: Fixtures) -> dict:
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=limits) as client:
+        shoppers = [Shopper(n, client, fixtures, recorder) for n in range(args.users)]
+
+        if args.warmup > 0:
+            stop_at = time.perf_counter() + args.warmup
+            await asyncio.gather(*(shopper.run(stop_at) for shopper in shoppers))
+
+        recorder.measuring = True
+        started = time.perf_counter()
+        await asyncio.gather(*(shopper.run(started + args.duration) for shopper in shoppers))
+        elapsed = time.perf_counter() - started
+    await async_engine.dispose()
+    return recorder.summary(elapsed)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def report(results: dict) -> None:
+    print(f"{'endpoint':<34} {'requests':>8} {'errors':>6} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    rows = list(results["endpoints"].items()) + [("total", results["total"])]
+    for label, stats in rows:
+        print(f"{label:<34} {stats['requests']:>8} {stats['errors']:>6} {stats['throughput']:>8.1f} "
+              f"{stats.get('p50_ms', 0):>8.1f} {stats.get('p95_ms', 0):>8.1f} "
+              f"{stats.get('p99_ms', 0):>8.1f} {stats.get('max_ms', 0):>8.1f}")
+    for label, statuses in results["endpoints"].items():
+        if statuses["error_statuses"]:
+            print(f"  {label} errors: " + ", ".join(f"{code} x{n}" for code, n in statuses["error_statuses"].items()))
+
+
+def compare(results: dict, path: str) -> int:
+    with open(path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    print(f"\nCompared with {path} (commit {baseline['meta'].get('commit') or '?'}):")
+    regressions = []
+    for label, stats in results["endpoints"].items():
+        before = baseline["endpoints"].get(label)
+        if not before:
+            print(f"  {label:<34} new endpoint")
+            continue
+        changes = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            change = (stats[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            changes.append(f"{key[:3]} {before[key]:.1f} -> {stats[key]:.1f} ({change:+.0f}%)")
+            if key == "p95_ms" and args.max_regression is not None and change > args.max_regression:
+                regressions.append(label)
+        print(f"  {label:<34} {', '.join(changes)}")
+    if regressions:
+        print(f"p95 regressed by more than {args.max_regression:.0f}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        fixtures = Fixtures(db)
+    finally:
+        db.close()
+    problems = fixtures.missing()
+    if problems:
+        print("Can't run: " + "; ".join(problems))
+        return 1
+
+    mix = ", ".join(f"{name}={weight:g}" for name, weight in args.mix.items())
+    print(f"{fixtures.counts['products']} products, {fixtures.counts['users']} users, "
+          f"{fixtures.counts['orders']} orders on {engine.dialect.name}; {args.users} shoppers for "
+          f"{args.duration:g}s after {args.warmup:g}s warm-up ({mix})")
+    slow_queries.clear()
+    results = asyncio.run(run(fixtures))
+    report(results)
+
+    slowest = sorted(slow_queries.entries(), key=lambda entry: entry["duration_ms"], reverse=True)
+    if slowest:
+        print(f"\n{len(slowest)} statement(s) over {settings.SLOW_QUERY_THRESHOLD_MS:g} ms, slowest:")
+        for entry in slowest[:5]:
+            print(f"  {entry['duration_ms']:8.1f} ms  {entry['route']}  {' '.join(entry['statement'].split())[:100]}")
+
+    results["meta"] = {
+        "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "rows": fixtures.counts,
+        "users": args.users,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "mix": args.mix,
+        "seed": args.seed,
+        "catalog_cache": not args.no_cache,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as out:
+            json.dump(results, out, indent=2)
+        print(f"Saved results to {args.save}")
+    if args.compare:
+        return compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,12 +2,13 @@
 import sys
 sys.path.insert(0, '.')
 
-from app.database import engine, SessionLocal, Base
+from app.database import SessionLocal
 from app.models.category import Category
 from app.models.product import Product
+from app.utils.schema import upgrade_database
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+# Apply any pending migrations (alembic upgrade head)
+upgrade_database()
 
 # Sample data
 categories = [
@@ -53,7 +53,8 @@ echo.
 echo Next steps:
 echo 1. Update .env file with your configuration
 echo 2. Create PostgreSQL database: brands_galaxy
-echo 3. Run the server: uvicorn app.main:app --reload
+echo 3. Create tables: alembic upgrade head
+echo 4. Run the server: uvicorn app.main:app --reload
 echo.
 echo To activate the virtual environment in future sessions:
 echo   venv\Scripts\activate
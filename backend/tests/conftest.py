@@ -0,0 +1,21 @@
+"""Run the tests against a throwaway SQLite database migrated to head.
+
+Set TEST_DATABASE_URL to run them against another (empty) database, such
+as PostgreSQL, instead.
+"""
+import os
+import tempfile
+
+import pytest
+
+# Before anything imports app.config
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or (
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='tests_'), 'test.db')}"
+)
+os.environ.setdefault("JOB_WORKER_IN_PROCESS", "false")
+
+
+@pytest.fixture(scope="session")
+def migrated_database():
+    from app.utils.schema import upgrade_database
+    upgrade_database()
@@ -0,0 +1,68 @@
+"""Cache invalidations reach the other workers (app/utils/cache_sync.py)"""
+import asyncio
+import uuid
+
+from app.utils.cache import TTLCache
+from app.utils.cache_sync import CacheSync
+from app.utils.http_cache import ResponseCache
+
+
+def worker_cache(namespace):
+    """One worker's cache and sync, as app/routes/products.py sets them up"""
+    cache = ResponseCache(TTLCache(), namespace=namespace)
+    return cache, CacheSync(cache.namespace, cache.invalidate)
+
+
+def test_invalidation_reaches_other_workers(migrated_database):
+    namespace = f"test-{uuid.uuid4().hex[:8]}"
+    cache_a, sync_a = worker_cache(namespace)
+    cache_b, sync_b = worker_cache(namespace)
+
+    async def scenario():
+        await sync_a.sync()
+        await sync_b.sync()
+        before_a, before_b = cache_a._generation(), cache_b._generation()
+
+        sync_a.invalidate()
+        invalidated_a = cache_a._generation()
+        assert invalidated_a != before_a
+        assert cache_b._generation() == before_b
+
+        await sync_a.sync()
+        # Publishing its own invalidation doesn't empty the worker's cache again
+        assert cache_a._generation() == invalidated_a
+
+        await sync_b.sync()
+        assert cache_b._generation() != before_b
+
+    asyncio.run(scenario())
+
+
+def test_user_flag_changes_from_another_process_reach_the_workers(migrated_database):
+    from app.database import SessionLocal
+    from app.models.user import AUTH_CACHE_NAMESPACE, User
+
+    # A serving worker's user cache, holding a user it authorized earlier
+    cache = TTLCache()
+    sync = CacheSync(AUTH_CACHE_NAMESPACE, cache.clear)
+    asyncio.run(sync.sync())
+
+    # What create_admin.py or an admin shell does: a sync session in another process
+    db = SessionLocal()
+    try:
+        user = User(email=f"{uuid.uuid4().hex}@example.com", password_hash="x", full_name="Shopper")
+        db.add(user)
+        db.commit()
+        cache.set(f"auth:user:{user.id}", {"id": user.id, "is_active": True, "is_admin": False})
+
+        asyncio.run(sync.sync())
+        # Creating a user changes nobody's cached flags
+        assert len(cache) == 1
+
+        user.is_active = False
+        db.commit()
+    finally:
+        db.close()
+
+    asyncio.run(sync.sync())
+    assert len(cache) == 0
@@ -0,0 +1,143 @@
+"""Category closure maintenance and the queries built on it (app/models/category.py)"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.main import app
+from app.models import Category, CategoryClosure, Product
+from app.routes.products import catalog_cache
+
+
+@pytest.fixture
+def db(migrated_database):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.fixture
+def tree(db):
+    """skincare > serums > night serums, and a separate gifts root, with one active product in each"""
+    suffix = uuid.uuid4().hex[:8]
+    categories = {}
+    for name, parent in (("skincare", None), ("serums", "skincare"), ("night", "serums"), ("gifts", None)):
+        category = Category(name=f"{name} {suffix}", slug=f"{name}-{suffix}",
+                            parent_id=categories[parent].id if parent else None)
+        db.add(category)
+        db.flush()
+        categories[name] = category
+
+    products = {}
+    for name in categories:
+        product = Product(name=f"{name} product", slug=f"{name}-product-{suffix}", brand="Acme",
+                          category_id=categories[name].id, price=10, stock_quantity=5, images=[])
+        products[name] = product
+    # Inactive products count nowhere
+    db.add(Product(name="retired", slug=f"retired-{suffix}", brand="Acme", category_id=categories["night"].id,
+                   price=10, is_active=False))
+    db.add_all(products.values())
+    db.commit()
+    return categories, products
+
+
+def closure(db, categories) -> set:
+    """(ancestor, descendant, depth) rows among the tree's categories, by name"""
+    names = {category.id: name for name, category in categories.items()}
+    rows = db.execute(select(CategoryClosure).filter(CategoryClosure.descendant_id.in_(names))).scalars()
+    return {(names[row.ancestor_id], names[row.descendant_id], row.depth) for row in rows}
+
+
+def subtree_products(categories, products, name) -> set:
+    catalog_cache.invalidate()
+    response = TestClient(app).get("/api/v1/products/", params={
+        "category": categories[name].id, "include_descendants": "true", "limit": 100
+    })
+    assert response.status_code == 200
+    names = {product.id: product_name for product_name, product in products.items()}
+    return {names[product["id"]] for product in response.json()}
+
+
+def tree_counts(categories) -> dict:
+    catalog_cache.invalidate()
+    response = TestClient(app).get("/api/v1/products/categories/tree")
+    assert response.status_code == 200
+    names = {category.id: name for name, category in categories.items()}
+    counts, stack = {}, list(response.json())
+    while stack:
+        node = stack.pop()
+        if node["id"] in names:
+            children = sorted(names[child["id"]] for child in node["children"])
+            counts[names[node["id"]]] = (node["product_count"], children)
+        stack.extend(node["children"])
+    return counts
+
+
+def test_insert_links_every_ancestor(db, tree):
+    categories, products = tree
+    assert closure(db, categories) == {
+        ("skincare", "skincare", 0), ("serums", "serums", 0), ("night", "night", 0), ("gifts", "gifts", 0),
+        ("skincare", "serums", 1), ("serums", "night", 1), ("skincare", "night", 2),
+    }
+    assert subtree_products(categories, products, "skincare") == {"skincare", "serums", "night"}
+    assert subtree_products(categories, products, "serums") == {"serums", "night"}
+    assert tree_counts(categories) == {
+        "skincare": (3, ["serums"]), "serums": (2, ["night"]), "night": (1, []), "gifts": (1, []),
+    }
+
+
+def test_moving_a_subtree_relinks_it_under_the_new_parent(db, tree):
+    categories, products = tree
+    categories["serums"].parent_id = categories["gifts"].id
+    db.commit()
+
+    assert closure(db, categories) == {
+        ("skincare", "skincare", 0), ("serums", "serums", 0), ("night", "night", 0), ("gifts", "gifts", 0),
+        ("gifts", "serums", 1), ("serums", "night", 1), ("gifts", "night", 2),
+    }
+    assert subtree_products(categories, products, "skincare") == {"skincare"}
+    assert subtree_products(categories, products, "gifts") == {"gifts", "serums", "night"}
+    assert tree_counts(categories) == {
+        "skincare": (1, []), "gifts": (3, ["serums"]), "serums": (2, ["night"]), "night": (1, []),
+    }
+
+    # Back to the top level
+    categories["serums"].parent_id = None
+    db.commit()
+    assert closure(db, categories) == {
+        ("skincare", "skincare", 0), ("serums", "serums", 0), ("night", "night", 0), ("gifts", "gifts", 0),
+        ("serums", "night", 1),
+    }
+
+
+@pytest.mark.parametrize("new_parent", ["skincare", "night"])
+def test_a_category_cannot_move_under_itself_or_its_subtree(db, tree, new_parent):
+    categories, _ = tree
+    before = closure(db, categories)
+
+    categories["skincare"].parent_id = categories[new_parent].id
+    with pytest.raises(ValueError):
+        db.commit()
+    db.rollback()
+
+    assert closure(db, categories) == before
+
+
+def test_deleting_a_leaf_removes_its_rows(db, tree):
+    categories, _ = tree
+    leaf = categories.pop("night")
+    db.query(Product).filter(Product.category_id == leaf.id).delete()
+    db.delete(leaf)
+    db.commit()
+
+    assert db.execute(select(CategoryClosure).filter(
+        (CategoryClosure.ancestor_id == leaf.id) | (CategoryClosure.descendant_id == leaf.id)
+    )).first() is None
+    assert closure(db, categories) == {
+        ("skincare", "skincare", 0), ("serums", "serums", 0), ("gifts", "gifts", 0), ("skincare", "serums", 1),
+    }
@@ -0,0 +1,37 @@
+"""daily_stats rollup maintenance (app/utils/stats.py)"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.database import SessionLocal
+from app.models import DailyStats
+from app.utils import stats
+
+DAY = date(2001, 2, 3)
+
+
+@pytest.fixture
+def db(migrated_database):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.mark.parametrize("native_upsert", [True, False], ids=["upsert", "update-then-insert"])
+def test_apply_creates_then_increments_the_day(db, monkeypatch, native_upsert):
+    if not native_upsert:
+        # The path taken on databases other than PostgreSQL and SQLite
+        monkeypatch.setattr(stats, "_DIALECT_INSERTS", {})
+
+    stats._apply(db, DAY, {"order_count": 1, "paid_orders": 1, "revenue": Decimal("10.50")})
+    stats._apply(db, DAY, {"order_count": 1, "paid_orders": -1, "cancelled_orders": 1})
+
+    row = db.get(DailyStats, DAY)
+    db.refresh(row)
+    assert (row.order_count, row.paid_orders, row.cancelled_orders) == (2, 0, 1)
+    assert row.revenue == Decimal("10.50")
+    assert row.new_users == 0
@@ -0,0 +1,33 @@
+"""Admin dashboard response shape"""
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app.models import Order, User
+from app.utils.auth import create_access_token
+
+
+def test_recent_orders_leave_out_internal_columns(migrated_database):
+    suffix = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    try:
+        admin = User(email=f"dashboard-{suffix}@example.com", password_hash="-", full_name="Admin", is_admin=True)
+        db.add(admin)
+        db.flush()
+        db.add(Order(
+            user_id=admin.id, order_number=f"ORD-DASH-{suffix}", total_amount=10, subtotal=10,
+            shipping_address={}, idempotency_key=f"key-{suffix}", request_fingerprint="0" * 64
+        ))
+        db.commit()
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.id})}"}
+    finally:
+        db.close()
+
+    response = TestClient(app).get("/api/v1/admin/dashboard", headers=headers)
+    assert response.status_code == 200
+    recent = next(order for order in response.json()["recentOrders"] if order["order_number"] == f"ORD-DASH-{suffix}")
+    assert "idempotency_key" not in recent
+    assert "request_fingerprint" not in recent
+    assert recent["total_amount"] is not None
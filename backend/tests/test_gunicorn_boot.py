@@ -0,0 +1,62 @@
+"""Boot the API under gunicorn.conf.py the way the Procfile does"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+pytest.importorskip("gunicorn")
+pytest.importorskip("prometheus_client")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_boots_with_missing_multiproc_dir(tmp_path):
+    port = free_port()
+    multiproc_dir = tmp_path / "prometheus" / "missing"
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp_path / 'boot.db'}",
+        PROMETHEUS_MULTIPROC_DIR=str(multiproc_dir),
+        PORT=str(port),
+        WEB_CONCURRENCY="2",
+        JOB_WORKER_IN_PROCESS="false",
+    )
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"],
+                   cwd=BACKEND_DIR, env=env, check=True, capture_output=True)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            assert server.poll() is None, server.stdout.read()
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/health", timeout=2)
+                break
+            except httpx.TransportError:
+                assert time.monotonic() < deadline, "gunicorn did not start serving within 30s"
+                time.sleep(0.2)
+        assert response.status_code == 200
+        assert multiproc_dir.is_dir()
+
+        metrics = httpx.get(f"http://127.0.0.1:{port}/metrics", timeout=5)
+        assert metrics.status_code == 200
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
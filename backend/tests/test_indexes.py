@@ -0,0 +1,15 @@
+"""Every hot route query must be served by an index (app/utils/index_audit.py)"""
+import pytest
+
+from app.database import engine
+from app.utils.index_audit import audit_indexes, hot_queries
+
+
+@pytest.fixture(scope="module")
+def failures(migrated_database):
+    return audit_indexes(engine)
+
+
+@pytest.mark.parametrize("name", sorted(hot_queries()))
+def test_hot_query_uses_an_index(failures, name):
+    assert name not in failures, f"{name} falls back to a table scan: {failures[name]}"
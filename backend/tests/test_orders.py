@@ -0,0 +1,128 @@
+"""Order creation (app/routes/orders.py)"""
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app.models import Category, Product, User
+from app.routes import orders
+from app.utils.auth import create_access_token
+
+ORDERS = "/api/v1/orders/"
+
+
+@pytest.fixture
+def shop(migrated_database):
+    """A customer and a product with 3 units in stock"""
+    suffix = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    try:
+        category = Category(name=f"Orders {suffix}", slug=f"orders-{suffix}")
+        db.add(category)
+        db.flush()
+        product = Product(name="Serum", slug=f"serum-{suffix}", brand="Acme", category_id=category.id,
+                          price=10, stock_quantity=3)
+        customer = User(email=f"orders-{suffix}@example.com", password_hash="-", full_name="Customer")
+        db.add_all([product, customer])
+        db.commit()
+        yield SimpleNamespace(
+            client=TestClient(app),
+            product_id=product.id,
+            headers={"Authorization": f"Bearer {create_access_token({'sub': customer.id})}"},
+        )
+    finally:
+        db.close()
+
+
+def order_body(shop, quantity=1, **extra):
+    return {"items": [{"product_id": shop.product_id, "quantity": quantity}], "shipping_address": {}, **extra}
+
+
+def test_catalog_cache_is_invalidated_only_when_a_product_sells_out(shop, monkeypatch):
+    invalidations = []
+    monkeypatch.setattr(orders.catalog_sync, "invalidate", lambda: invalidations.append(True))
+
+    assert shop.client.post(ORDERS, json=order_body(shop, 2), headers=shop.headers).status_code == 201
+    assert invalidations == []
+
+    assert shop.client.post(ORDERS, json=order_body(shop, 1), headers=shop.headers).status_code == 201
+    assert invalidations == [True]
+
+
+@pytest.fixture
+def failures(monkeypatch):
+    """Reasons passed to record_checkout_failure"""
+    reasons = []
+    monkeypatch.setattr(orders, "record_checkout_failure", lambda stage, reason: reasons.append(reason))
+    return reasons
+
+
+def test_retry_with_the_same_key_replays_the_order(shop):
+    headers = {**shop.headers, "Idempotency-Key": f"key-{uuid.uuid4().hex}"}
+    first = shop.client.post(ORDERS, json=order_body(shop), headers=headers)
+    retry = shop.client.post(ORDERS, json=order_body(shop), headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    db = SessionLocal()
+    try:
+        assert db.get(Product, shop.product_id).stock_quantity == 2
+    finally:
+        db.close()
+
+
+def test_key_reused_for_a_different_order_is_refused(shop):
+    headers = {**shop.headers, "Idempotency-Key": f"key-{uuid.uuid4().hex}"}
+    assert shop.client.post(ORDERS, json=order_body(shop, 1), headers=headers).status_code == 201
+
+    reused = shop.client.post(ORDERS, json=order_body(shop, 2), headers=headers)
+    assert reused.status_code == 422
+    assert "Idempotency-Key" in reused.json()["detail"]
+
+
+def test_concurrent_duplicate_replays_the_order_that_won(shop, monkeypatch):
+    headers = {**shop.headers, "Idempotency-Key": f"key-{uuid.uuid4().hex}"}
+    first = shop.client.post(ORDERS, json=order_body(shop), headers=headers)
+
+    # The duplicate checks before the first one commits, so only the unique index catches it
+    lookup, raced = orders._find_idempotent_order, []
+
+    async def not_committed_yet(db, user_id, key):
+        if not raced:
+            raced.append(True)
+            return None
+        return await lookup(db, user_id, key)
+
+    monkeypatch.setattr(orders, "_find_idempotent_order", not_committed_yet)
+    duplicate = shop.client.post(ORDERS, json=order_body(shop), headers=headers)
+
+    assert duplicate.status_code == 201
+    assert duplicate.json()["id"] == first.json()["id"]
+    assert duplicate.headers["Idempotent-Replayed"] == "true"
+
+
+def test_payment_intent_used_by_another_order_conflicts(shop, failures):
+    body = order_body(shop, payment_intent_id=f"pi_{uuid.uuid4().hex}")
+    first = shop.client.post(ORDERS, json=body, headers={**shop.headers, "Idempotency-Key": "a" + uuid.uuid4().hex})
+    other = shop.client.post(ORDERS, json=body, headers={**shop.headers, "Idempotency-Key": "b" + uuid.uuid4().hex})
+
+    assert first.status_code == 201
+    assert other.status_code == 409
+    assert failures == ["payment_intent_used"]
+
+
+def test_other_integrity_errors_are_not_reported_as_a_used_payment_intent(shop, failures, monkeypatch):
+    # Every order gets the same order_number, so the second violates its unique constraint
+    fixed = uuid.uuid4()
+    monkeypatch.setattr(orders, "uuid", SimpleNamespace(uuid4=lambda: fixed))
+
+    assert shop.client.post(ORDERS, json=order_body(shop), headers=shop.headers).status_code == 201
+    clash = shop.client.post(ORDERS, json=order_body(shop), headers=shop.headers)
+
+    assert clash.status_code == 500
+    assert failures == ["error"]
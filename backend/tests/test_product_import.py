@@ -0,0 +1,84 @@
+"""Bulk product import over existing rows (app/utils/product_io.py)"""
+import io
+import json
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from app.database import SessionLocal
+from app.models import Category, Product
+from app.utils import product_io
+from app.utils.product_io import ProductImporter, category_lookup_query, read_rows, write_chunk
+
+
+@pytest.fixture
+def db(migrated_database):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+def _import(db, fmt: str, feed: str) -> dict:
+    importer = ProductImporter(dict(db.execute(category_lookup_query()).all()), chunk_size=2)
+    for chunk in importer.chunks(read_rows(io.StringIO(feed), fmt)):
+        write_chunk(db, chunk)
+        db.commit()
+    return importer.report()
+
+
+@pytest.mark.parametrize("native_upsert", [True, False], ids=["upsert", "update-then-insert"])
+def test_partial_rows_only_update_the_columns_they_supply(db, monkeypatch, native_upsert):
+    if not native_upsert:
+        # The path taken on databases other than PostgreSQL and SQLite
+        monkeypatch.setattr(product_io, "_DIALECT_INSERTS", {})
+
+    suffix = uuid.uuid4().hex[:8]
+    category = Category(name="Serums", slug=f"serums-{suffix}")
+    db.add(category)
+    db.flush()
+    existing = Product(
+        name="Night Serum", slug=f"night-serum-{suffix}", brand="Acme", category_id=category.id,
+        price=Decimal("20.00"), stock_quantity=7, reserved_quantity=2, reorder_threshold=3,
+        images=["a.jpg"], is_featured=True, is_active=False, description="Keep me"
+    )
+    db.add(existing)
+    db.commit()
+
+    # A price feed: no stock, images, flags or description
+    report = _import(db, "csv", "\n".join([
+        "slug,name,brand,category_slug,price,stock_quantity",
+        f"night-serum-{suffix},Night Serum,Acme,serums-{suffix},12.50,",
+        f"day-cream-{suffix},Day Cream,Acme,serums-{suffix},9.99,",
+        f"bad-price-{suffix},Bad,Acme,serums-{suffix},-1,",
+        f"lost-{suffix},Lost,Acme,no-such-category-{suffix},5.00,",
+    ]))
+
+    assert (report["processed"], report["imported"], report["failed"]) == (4, 2, 2)
+    assert [(error.line, error.slug) for error in report["errors"]] == [
+        (4, f"bad-price-{suffix}"), (5, f"lost-{suffix}")
+    ]
+    assert report["errors"][0].errors[0].startswith("price:")
+    assert report["errors"][1].errors == [f"category_slug: unknown category 'no-such-category-{suffix}'"]
+
+    db.refresh(existing)
+    assert existing.price == Decimal("12.50")
+    assert (existing.stock_quantity, existing.reserved_quantity, existing.reorder_threshold) == (7, 2, 3)
+    assert (existing.images, existing.is_featured, existing.is_active) == (["a.jpg"], True, False)
+    assert existing.description == "Keep me"
+
+    # A new slug gets the schema defaults
+    created = db.query(Product).filter(Product.slug == f"day-cream-{suffix}").one()
+    assert (created.stock_quantity, created.images, created.is_featured, created.is_active) == (0, [], False, True)
+
+    # Columns a row does supply are written, explicit nulls included
+    _import(db, "ndjson", json.dumps({
+        "slug": f"night-serum-{suffix}", "name": "Night Serum", "brand": "Acme", "category_id": category.id,
+        "price": "12.50", "stock_quantity": 40, "is_active": True, "description": None,
+    }) + "\n")
+    db.refresh(existing)
+    assert (existing.stock_quantity, existing.is_active, existing.description) == (40, True, None)
+    assert existing.images == ["a.jpg"]
@@ -0,0 +1,78 @@
+"""Order listings must issue a constant number of queries, however many orders they return"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal, async_engine
+from app.main import app
+from app.models import Category, Order, OrderItem, Product, User
+from app.utils.auth import create_access_token
+from app.utils.query_counter import count_queries
+
+# Maximum statements per request, independent of how many orders come back
+QUERY_BUDGETS = {
+    "/api/v1/orders/": 3,
+    "/api/v1/admin/orders?limit=100": 3,
+}
+
+
+def seed_orders(db, user, product, count):
+    for _ in range(count):
+        order = Order(
+            user_id=user.id,
+            order_number=f"ORD-CHECK-{uuid.uuid4().hex[:12]}",
+            total_amount=10,
+            subtotal=10,
+            status="paid",
+            shipping_address={}
+        )
+        order.items = [
+            OrderItem(product_id=product.id, quantity=1, price=10, product_name=product.name)
+            for _ in range(3)
+        ]
+        db.add(order)
+    db.commit()
+
+
+@pytest.fixture(scope="module")
+def query_counts(migrated_database):
+    """Queries per request for each listing, after seeding 2 and then 42 orders"""
+    suffix = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    try:
+        category = Category(name=f"Check {suffix}", slug=f"check-{suffix}")
+        db.add(category)
+        db.flush()
+        product = Product(name="Check", slug=f"check-{suffix}", brand="Check", category_id=category.id, price=10)
+        admin = User(email=f"check-{suffix}@example.com", password_hash="-", full_name="Check", is_admin=True)
+        db.add_all([product, admin])
+        db.commit()
+
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': admin.id})}"}
+        # Warm the auth cache so every measured request does the same lookups
+        client.get("/api/v1/auth/me", headers=headers).raise_for_status()
+
+        counts = {}
+        for batch in (2, 40):
+            seed_orders(db, admin, product, batch)
+            for path in QUERY_BUDGETS:
+                with count_queries(async_engine) as counter:
+                    response = client.get(path, headers=headers)
+                response.raise_for_status()
+                counts.setdefault(path, []).append(counter.count)
+        return counts
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("path", sorted(QUERY_BUDGETS))
+def test_query_count_is_constant(query_counts, path):
+    few, many = query_counts[path]
+    assert few == many, f"{path} issued {few} queries for 2 orders and {many} for 42"
+
+
+@pytest.mark.parametrize("path", sorted(QUERY_BUDGETS))
+def test_query_count_within_budget(query_counts, path):
+    assert max(query_counts[path]) <= QUERY_BUDGETS[path], query_counts[path]
@@ -0,0 +1,93 @@
+"""Stock holds taken at payment-intent time (app/utils/reservations.py)"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models.product import Product
+from app.models.quote import StockHold
+from app.utils.pricing import PricedCart, PricedLine
+from app.utils.reservations import release_holds, reserve_stock
+
+
+def _cart(product_id: str, quantity: int) -> PricedCart:
+    return PricedCart(
+        lines=[PricedLine(product_id=product_id, product_name="Serum", quantity=quantity,
+                          unit_price=100, stock_quantity=0)],
+        subtotal=100, shipping=0, tax=0, total=100
+    )
+
+
+async def _reserve(product_id: str, intent_id: str, user_id: str, quantity: int) -> None:
+    async with AsyncSessionLocal() as db:
+        try:
+            await reserve_stock(db, intent_id, user_id, _cart(product_id, quantity),
+                                datetime.utcnow() + timedelta(minutes=15))
+            await db.commit()
+        except HTTPException:
+            await db.rollback()
+            raise
+
+
+async def _state(product_id: str):
+    async with AsyncSessionLocal() as db:
+        reserved = await db.scalar(select(Product.reserved_quantity).where(Product.id == product_id))
+        held = await db.scalar(select(func.coalesce(func.sum(StockHold.quantity), 0))
+                               .where(StockHold.product_id == product_id))
+        return reserved, held
+
+
+def _product(stock: int) -> str:
+    product_id = str(uuid.uuid4())
+
+    async def create():
+        async with AsyncSessionLocal() as db:
+            db.add(Product(id=product_id, name="Serum", slug=f"serum-{product_id}", price=100,
+                           stock_quantity=stock))
+            await db.commit()
+
+    asyncio.run(create())
+    return product_id
+
+
+def test_new_payment_intent_replaces_the_users_earlier_holds(migrated_database):
+    product_id = _product(stock=5)
+    user_id = str(uuid.uuid4())
+
+    async def scenario():
+        for _ in range(3):
+            await _reserve(product_id, f"pi_{uuid.uuid4().hex}", user_id, 4)
+        assert await _state(product_id) == (4, 4)
+
+        # Another shopper can't take units that are held, only the free one
+        with pytest.raises(HTTPException):
+            await _reserve(product_id, f"pi_{uuid.uuid4().hex}", str(uuid.uuid4()), 2)
+        assert await _state(product_id) == (4, 4)
+
+        # A smaller cart shrinks the hold
+        await _reserve(product_id, "pi_last", user_id, 1)
+        assert await _state(product_id) == (1, 1)
+
+        async with AsyncSessionLocal() as db:
+            assert await release_holds(db, "pi_last") == 1
+            await db.commit()
+        assert await _state(product_id) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_failed_reservation_keeps_the_earlier_holds(migrated_database):
+    product_id = _product(stock=3)
+    user_id = str(uuid.uuid4())
+
+    async def scenario():
+        await _reserve(product_id, "pi_first", user_id, 2)
+        with pytest.raises(HTTPException):
+            await _reserve(product_id, "pi_second", user_id, 4)
+        assert await _state(product_id) == (2, 2)
+
+    asyncio.run(scenario())
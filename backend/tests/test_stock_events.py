@@ -0,0 +1,36 @@
+"""Stock state changes reach the low-stock streams of every worker (app/utils/low_stock.py)"""
+import asyncio
+import uuid
+
+from app.database import AsyncSessionLocal
+from app.utils.low_stock import (
+    IN_STOCK, LOW_STOCK, StockEventBroadcaster, StockEventRelay, record_stock_change
+)
+
+
+def test_committed_changes_are_relayed_and_rolled_back_ones_are_not(migrated_database):
+    product_id = str(uuid.uuid4())
+    # Two workers, each relaying to its own subscribers
+    broadcasters = [StockEventBroadcaster(), StockEventBroadcaster()]
+    relays = [StockEventRelay(broadcaster) for broadcaster in broadcasters]
+
+    async def scenario():
+        with broadcasters[0].subscribe() as first, broadcasters[1].subscribe() as second:
+            async with AsyncSessionLocal() as db:
+                for relay in relays:
+                    await relay.poll(db)
+
+                record_stock_change(db, product_id, "Serum", IN_STOCK, 3, 10)
+                await db.commit()
+                record_stock_change(db, product_id, "Serum", LOW_STOCK, 0, 10)
+                await db.rollback()
+
+                assert [await relay.poll(db) for relay in relays] == [1, 1]
+                assert [await relay.poll(db) for relay in relays] == [0, 0]
+
+            for queue in (first, second):
+                stock_event = await asyncio.wait_for(queue.get(), 1)
+                assert (stock_event["product_id"], stock_event["event"]) == (product_id, LOW_STOCK)
+                assert queue.empty()
+
+    asyncio.run(scenario())
@@ -0,0 +1,36 @@
+"""Run background jobs (order emails, stock alerts) outside the web process
+
+    python worker.py
+
+Run alongside `uvicorn app.main:app` with JOB_WORKER_IN_PROCESS=false so the
+API processes only enqueue. Any number of workers can share the jobs table.
+"""
+import asyncio
+import logging
+import signal
+import sys
+sys.path.insert(0, '.')
+
+from app.utils import notifications  # noqa: F401 - registers the job handlers
+from app.utils.jobs import run_worker
+from app.database import async_engine
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    # Finish the jobs in hand, then exit
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    logging.getLogger("worker").info("Job worker started")
+    try:
+        await run_worker(stop)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
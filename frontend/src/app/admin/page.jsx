@@ -25,7 +25,7 @@ export default function AdminDashboard() {
       setLoading(true);
       const [dashboardRes, lowStockRes] = await Promise.all([
         adminAPI.getDashboard(),
-        adminAPI.getLowStock(10)
+        adminAPI.getLowStock()
       ]);
       setStats(dashboardRes.data.stats);
       setLowStock(lowStockRes.data.products || []);
@@ -26,6 +26,8 @@ export default function ProductsPage() {
       setLoading(true);
       // Filter out empty strings and false values
       const params = {
+        // Only what ProductCard renders
+        fields: 'id,name,slug,brand,price,discount_price,images,stock_quantity',
         sort_by: filters.sort_by,
         sort_order: filters.sort_order,
         ...(filters.min_price !== '' && { min_price: filters.min_price }),
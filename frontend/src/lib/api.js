@@ -106,7 +106,8 @@ export const adminAPI = {
   getUsers: () =>
     api.get('/admin/users'),
 
-  getLowStock: (threshold = 10) =>
+  // Without a threshold each product's own reorder threshold applies
+  getLowStock: (threshold) =>
     api.get('/admin/products/low-stock', { params: { threshold } }),
 };
 